@@ -79,6 +79,14 @@ class SocialManager:
             for platform in SocialPlatform
         }
 
+    async def get_login_status_async(self) -> dict[str, bool]:
+        """get_login_status 的非同步版本，供 API 路由使用。
+
+        各平台檢查皆為記憶體內的設定讀取，唯一的阻塞操作是 Threads 瀏覽器狀態檔的 stat，
+        因此整批交由執行緒池執行一次即可，不需逐平台並行。
+        """
+        return await asyncio.to_thread(self.get_login_status)
+
     def is_platform_logged_in(self, platform: SocialPlatform) -> bool:
         """確認特定平台的 API 或 Session 是否已就緒。"""
         return self._check_platform_credentials(platform)
@@ -515,23 +523,9 @@ class SocialManager:
         以避免連續選到同一張。
         """
         try:
-            # 相對於此文件的證據存儲目錄
-            base_path = Path(__file__).parent.parent.parent / "hostage_evidence"
-            metadata_file = base_path / "metadata.json"
-            if not metadata_file.exists():
-                return None
-
-            import json
-            with open(metadata_file, 'r', encoding='utf-8') as f:
-                metadata = json.load(f)
-
-            # 過濾出已選取且實體檔案存在的照片
-            selected_images = []
-            for image_id, data in metadata.items():
-                if data.get('selected', False):
-                    image_path = base_path / data['filename']
-                    if image_path.exists():
-                        selected_images.append(str(image_path))
+            # 透過人質路由模組的快取索引取得已選取且實體檔案存在的照片
+            from ..routers.hostage import get_selected_images
+            selected_images = get_selected_images()
 
             if not selected_images:
                 return None
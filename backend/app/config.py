@@ -35,6 +35,10 @@ class Settings(BaseSettings):
     MOCK_HARDWARE: bool = False
     MOCK_INTERVAL_MS: int = 500
 
+    # 以下憑證欄位為執行期唯一的讀取來源：啟動時由 .env 與憑證管理員合併而來，
+    # 之後由 routers/social.py 的 _save_* / _clear_* 於寫入憑證檔後同步更新。
+    # 未啟用 validate_assignment，指派僅為一般屬性寫入，不會觸發驗證。
+
     # Gmail SMTP 發送設定（直接整合）
     GMAIL_USER: Optional[str] = None
     GMAIL_APP_PASSWORD: Optional[str] = None
@@ -4,6 +4,7 @@
 負責持久化儲存社交平台（Gmail、Discord、Threads）的 API 憑證與機敏資訊。
 """
 import json
+import threading
 from pathlib import Path
 from typing import Optional
 from pydantic import BaseModel
@@ -24,6 +25,8 @@ class CredentialStore:
     def __init__(self, storage_path: str = "credentials.json"):
         """初始化儲存路徑並自動載入現有資料。"""
         self.storage_path = Path(storage_path)
+        # 路由會在執行緒池中呼叫更新方法，以鎖避免多個寫入同時覆寫檔案
+        self._save_lock = threading.Lock()
         self.credentials: PlatformCredentials = self._load()
 
     def _load(self) -> PlatformCredentials:
@@ -45,7 +48,7 @@ class CredentialStore:
             # 確保父層目錄已建立
             self.storage_path.parent.mkdir(parents=True, exist_ok=True)
 
-            with open(self.storage_path, 'w', encoding='utf-8') as f:
+            with self._save_lock, open(self.storage_path, 'w', encoding='utf-8') as f:
                 json.dump(
                     self.credentials.model_dump(exclude_none=False),
                     f,
@@ -10,6 +10,8 @@ from pathlib import Path
 from datetime import date
 from typing import Optional
 
+import orjson
+
 from .logger import safe_print
 
 
@@ -37,6 +39,9 @@ class DailyViolationStore:
         
         self._today_count: int = 0
         self._last_date: str = ""
+        # 已確認與 _last_date 相符的日期物件，同一天內直接比較日期物件，
+        # 不必每次查詢都重新格式化 ISO 字串（狀態序列化時皆會查詢次數）
+        self._checked_day: Optional[date] = None
         
         self._load()
     
@@ -59,13 +64,12 @@ class DailyViolationStore:
             self._save()
     
     def _save(self) -> None:
-        """將違規數據保存至磁碟。"""
+        """將違規數據保存至磁碟（每次違規皆會寫入，因此以精簡格式一次寫出）。"""
         try:
-            with open(self.data_file, 'w', encoding='utf-8') as f:
-                json.dump({
-                    'count': self._today_count,
-                    'last_date': self._last_date
-                }, f, ensure_ascii=False, indent=2)
+            self.data_file.write_bytes(orjson.dumps({
+                'count': self._today_count,
+                'last_date': self._last_date
+            }))
         except Exception as e:
             safe_print(f"[每日違規] 保存失敗：{e}")
     
@@ -75,11 +79,16 @@ class DailyViolationStore:
         Returns:
             bool: 是否觸發了日期重置
         """
-        today = date.today().isoformat()
-        if self._last_date != today:
+        today = date.today()
+        if today == self._checked_day:
+            return False
+
+        self._checked_day = today
+        today_iso = today.isoformat()
+        if self._last_date != today_iso:
             old_count = self._today_count
             self._today_count = 0
-            self._last_date = today
+            self._last_date = today_iso
             self._save()
             if old_count > 0:
                 safe_print(f"[每日違規] 日期變更，違規次數已從 {old_count} 重置為 0")
@@ -8,6 +8,7 @@
 
 import asyncio
 import sys
+import time
 from contextlib import asynccontextmanager
 from fastapi import FastAPI, WebSocket, WebSocketDisconnect, Request
 from fastapi.middleware.cors import CORSMiddleware
@@ -15,7 +16,6 @@ from fastapi.responses import JSONResponse
 import socketio
 import uvicorn
 import json
-from datetime import datetime
 
 # 為 Windows 系統進行修正 - Playwright 在 Windows 上所有 Python 版本都要求使用 ProactorEventLoop
 if sys.platform == 'win32':
@@ -57,6 +57,9 @@ async def lifespan(app: FastAPI):
     safe_print("[系統] 正在關閉系統...")
     await socket_manager.stop_mock_hardware()
     await social_manager.shutdown()
+    # 將尚未寫回的人質照片中繼資料與系統設定落盤
+    hostage.flush_metadata()
+    socket_manager.flush_settings()
 
 
 # 初始化 FastAPI 應用程式
@@ -117,6 +120,13 @@ fastapi_app.include_router(hardware.router)
 fastapi_app.include_router(hostage.router)
 fastapi_app.include_router(penalty.router)
 
+# 人質照片以靜態檔案方式提供，由 Starlette 直接處理檔案傳輸
+fastapi_app.mount(
+    hostage.HOSTAGE_FILES_PATH,
+    hostage.HostageStaticFiles(directory=hostage.HOSTAGE_DIR),
+    name="hostage_files"
+)
+
 # Socket.IO 整合 - 使用 Socket.IO 包裝 FastAPI 應用程式
 # 這是 python-socketio 與 FastAPI 配合的標準做法
 app = socketio.ASGIApp(
@@ -252,10 +262,10 @@ async def hardware_websocket(websocket: WebSocket):
                         'mock_state': socket_manager.mock_state.to_dict()
                     })
 
-                now = datetime.now()
+                now = time.monotonic()
                 last_log = socket_manager.last_log_time.get('hw_sensor_data')
                 # 每 5 秒輸出一次感測器數據流日誌，避免刷頻
-                if last_log is None or (now - last_log).total_seconds() >= 5.0:
+                if last_log is None or now - last_log >= 5.0:
                     safe_print(f"[硬體 WS] 📊 感測器數據傳輸中...")
                     socket_manager.last_log_time['hw_sensor_data'] = now
 
@@ -308,15 +318,8 @@ async def root():
 @fastapi_app.get("/api/state")
 async def get_system_state():
     # 獲取完整系統狀態，包含當前專注階段與各項感測值
-    state = socket_manager.state.model_dump()
-    if socket_manager.state.session:
-        if socket_manager.state.session.start_time:
-            state['session']['start_time'] = socket_manager.state.session.start_time.isoformat()
-        if socket_manager.state.session.end_time:
-            state['session']['end_time'] = socket_manager.state.session.end_time.isoformat()
-    if socket_manager.state.person_away_since:
-        state['person_away_since'] = socket_manager.state.person_away_since.isoformat()
-    return success_response(state)
+    # 以 JSON 模式匯出，日期時間與列舉直接轉為字串，不需逐欄轉換
+    return success_response(socket_manager.state.model_dump(mode='json'))
 
 
 @fastapi_app.get("/api/system/compatibility-check")
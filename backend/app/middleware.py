@@ -5,6 +5,7 @@
 """
 
 import time
+import uuid
 from typing import Callable
 from fastapi import Request, Response
 from starlette.middleware.base import BaseHTTPMiddleware
@@ -98,8 +99,6 @@ class RequestIdMiddleware(BaseHTTPMiddleware):
 
     async def dispatch(self, request: Request, call_next: Callable) -> Response:
         """在響應標頭中加入 X-Request-ID。"""
-        import uuid
-
         # 產生縮短版 UUID 作為請求標識
         request_id = str(uuid.uuid4())[:8]
         request.state.request_id = request_id
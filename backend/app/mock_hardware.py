@@ -6,8 +6,10 @@
 """
 
 import asyncio
+import itertools
 import random
-from datetime import datetime
+import time
+from functools import partial
 from typing import TYPE_CHECKING, Optional, Callable, Dict, Any
 
 from .config import settings
@@ -29,7 +31,15 @@ class MockHardwareState:
         manual_mode: 是否處於手動控制模式（不走隨機變化）
     """
 
+    # 欄位固定，以 __slots__ 省去每個實例的 __dict__ 並加快屬性存取
+    __slots__ = (
+        '_dict_view', 'phone_inserted', 'person_present', 'nfc_valid',
+        'box_locked', 'box_open', 'manual_mode', 'noise_min', 'noise_max'
+    )
+
     def __init__(self) -> None:
+        # to_dict() 的快取結果，修改公開屬性後需將其設為 None 使快取失效
+        self._dict_view: Optional[Dict[str, Any]] = None
         self.phone_inserted: bool = True
         self.person_present: bool = True
         self.nfc_valid: bool = True
@@ -40,17 +50,22 @@ class MockHardwareState:
         self.noise_max: int = 55
 
     def to_dict(self) -> Dict[str, Any]:
-        """將目前狀態轉換為字典格式，方便 JSON 序列化。"""
-        return {
-            'phone_inserted': self.phone_inserted,
-            'person_present': self.person_present,
-            'nfc_valid': self.nfc_valid,
-            'box_locked': self.box_locked,
-            'box_open': self.box_open,
-            'manual_mode': self.manual_mode,
-            'noise_min': self.noise_min,
-            'noise_max': self.noise_max
-        }
+        """將目前狀態轉換為字典格式，方便 JSON 序列化。
+
+        字典內容會被快取直到下一次狀態變動，回傳的是淺層複本，呼叫端可自由修改。
+        """
+        if self._dict_view is None:
+            self._dict_view = {
+                'phone_inserted': self.phone_inserted,
+                'person_present': self.person_present,
+                'nfc_valid': self.nfc_valid,
+                'box_locked': self.box_locked,
+                'box_open': self.box_open,
+                'manual_mode': self.manual_mode,
+                'noise_min': self.noise_min,
+                'noise_max': self.noise_max
+            }
+        return self._dict_view.copy()
 
     def reset(self) -> None:
         """重置所有模擬狀態為預設的「完美專注」狀態。"""
@@ -60,6 +75,32 @@ class MockHardwareState:
         self.box_locked = True
         self.box_open = False
         self.manual_mode = False
+        self._dict_view = None
+
+
+# set_state 可接受的欄位名稱（即 __slots__ 中的公開欄位），以集合查詢取代 hasattr 探測
+_MOCK_STATE_FIELDS = frozenset(
+    name for name in MockHardwareState.__slots__ if not name.startswith('_')
+)
+
+# 預先產生的模擬分貝值數量（以 100 ms 週期計算約 7 分鐘後才會重複）
+MIC_BUFFER_SIZE = 4096
+
+# 模擬感測器封包的欄位範本（鍵的順序與實體硬體封包一致），變動欄位於產生時填入
+_SENSOR_TEMPLATE: Dict[str, Any] = {
+    'nfc_id': None,
+    'gyro_x': 0.0,
+    'gyro_y': 0.0,
+    'gyro_z': 0.0,
+    'radar_presence': False,
+    'mic_db': 0,
+    'box_locked': True,
+    'box_open': False,
+    'timestamp': 0,
+    'nfc_detected': True,
+    'gyro_detected': False,
+    'ldr_detected': True
+}
 
 
 class MockHardwareController:
@@ -68,10 +109,14 @@ class MockHardwareController:
     負責管理模擬循環 (Loop) 以及與父層 SocketManager 的通訊。
     """
 
+    # 數據處理連續失敗時的重試間隔（秒）：自初始值起每次加倍，直到上限
+    ERROR_RETRY_INITIAL_SEC = 1.0
+    ERROR_RETRY_MAX_SEC = 30.0
+
     def __init__(
         self,
         state: MockHardwareState,
-        log_callback: Callable[[str, str, bool], None],
+        log_callback: Callable[..., None],
         broadcast_event_callback: Callable,
         process_sensor_callback: Callable,
         reset_state_callback: Callable,
@@ -81,7 +126,7 @@ class MockHardwareController:
 
         參數：
             state: 持久化的模擬狀態實例
-            log_callback: 輸出日誌到控制台的函式
+            log_callback: 輸出日誌到控制台的函式 (key, message, force[, args])
             broadcast_event_callback: 向前端廣播 Socket 事件的異步函式
             process_sensor_callback: 核心感測器數據處理邏輯
             reset_state_callback: 重置系統狀態的函式
@@ -94,25 +139,45 @@ class MockHardwareController:
         self._reset_state = reset_state_callback
         self._build_status = build_status_callback
 
-        self.mock_task: Optional[asyncio.Task] = None
         self.active: bool = False
 
+        # 定時排程：以 loop.call_at 固定頻率觸發，取代 while True + sleep 的常駐協程
+        self._tick_handle: Optional[asyncio.TimerHandle] = None
+        self._next_tick_at: float = 0.0
+        # 正在執行中的數據處理任務；前一筆尚未完成時略過該次觸發，避免任務堆積
+        self._step_task: Optional[asyncio.Task] = None
+        # 下一次失敗後的重試間隔，成功處理一筆數據即重置
+        self._retry_delay: float = self.ERROR_RETRY_INITIAL_SEC
+
+        # 噪音值產生器：僅在上下限變動時重建，避免每次生成數據都重新判斷
+        self._mic_gen: Callable[[], int] = self._build_mic_generator()
+
+    def _build_mic_generator(self) -> Callable[[], int]:
+        """依據目前的噪音上下限建立分貝值產生器。
+
+        當上下限相同時直接回傳常數；否則一次預先產生一段亂數並循環取用，
+        每次取值只需一次 next()，省去每次呼叫亂數產生器的開銷。
+        """
+        noise_min, noise_max = self.state.noise_min, self.state.noise_max
+        if noise_min == noise_max:
+            return lambda: noise_min
+        buffer = random.choices(range(noise_min, noise_max + 1), k=MIC_BUFFER_SIZE)
+        return partial(next, itertools.cycle(buffer))
+
     def _generate_sensor_data(self) -> Dict[str, Any]:
-        """根據目前的模擬狀態，合成對應的原始感測器封包。"""
-        return {
-            'nfc_id': 'PHONE_MOCK_001' if (self.state.phone_inserted and self.state.nfc_valid) else None,
-            'gyro_x': 0.0,
-            'gyro_y': 0.0,
-            'gyro_z': 0.0,
-            'radar_presence': self.state.person_present,
-            'mic_db': random.randint(self.state.noise_min, self.state.noise_max),
-            'box_locked': not self.state.box_open,
-            'box_open': self.state.box_open,
-            'timestamp': int(datetime.now().timestamp() * 1000),
-            'nfc_detected': True,
-            'gyro_detected': False,
-            'ldr_detected': True
-        }
+        """根據目前的模擬狀態，合成對應的原始感測器封包。
+
+        複製固定欄位範本後僅填入會變動的欄位，比每次建立完整的字典字面值更快。
+        """
+        state = self.state
+        data = _SENSOR_TEMPLATE.copy()
+        data['nfc_id'] = 'PHONE_MOCK_001' if (state.phone_inserted and state.nfc_valid) else None
+        data['radar_presence'] = state.person_present
+        data['mic_db'] = self._mic_gen()
+        data['box_locked'] = not state.box_open
+        data['box_open'] = state.box_open
+        data['timestamp'] = time.time_ns() // 1_000_000
+        return data
 
     async def start(self, hardware_connected_setter: Callable[[bool], None]) -> None:
         """啟動硬體模擬任務。"""
@@ -125,16 +190,11 @@ class MockHardwareController:
             self.active = True
             await self._reset_state()
 
-            # 若先前有殘留任務，先進行清理
-            if self.mock_task and not self.mock_task.done():
-                self.mock_task.cancel()
-                try:
-                    await self.mock_task
-                except asyncio.CancelledError:
-                    pass
+            # 若先前有殘留排程，先進行清理
+            await self._cancel_ticks()
 
-            # 啟動異步循環
-            self.mock_task = asyncio.create_task(self._loop())
+            # 啟動定時排程
+            self._start_ticks()
             hardware_connected_setter(True)
             self._log('mock_start', "[模擬] 虛擬硬體模擬已啟動", True)
 
@@ -159,15 +219,12 @@ class MockHardwareController:
         physical_hardware_connected: bool
     ) -> None:
         """關閉硬體模擬任務。"""
-        if self.mock_task:
-            self.mock_task.cancel()
+        if self._tick_handle is not None:
             try:
-                await self.mock_task
-            except asyncio.CancelledError:
-                pass
+                await self._cancel_ticks()
             except Exception as e:
                 self._log('mock_cancel_error', f"[模擬] 取消任務時發生異常：{e}", True)
-            self.mock_task = None
+            self._log('mock_cancel', "[模擬] ⏹️ 數據生成已停止", True)
 
         try:
             self.active = False
@@ -187,51 +244,111 @@ class MockHardwareController:
         except Exception as e:
             self._log('mock_stop_error', f"[模擬錯誤] 結束任務時發生異常：{e}", True)
 
-    async def _loop(self) -> None:
-        """主模擬循環：定期定時產生感測器數據報文。"""
+    def _start_ticks(self) -> None:
+        """開始以固定頻率定期產生感測器數據報文。"""
         self._log('mock_loop_start', "[模擬] ▶️ 感測器數據持續生成中...", True)
+        loop = asyncio.get_running_loop()
+        self._next_tick_at = loop.time()
+        self._schedule_tick(loop, settings.MOCK_INTERVAL_MS / 1000)
+
+    def _schedule_tick(self, loop: asyncio.AbstractEventLoop, delay: float) -> None:
+        """以絕對時間排定下一次觸發，處理時間不會累積成漂移。"""
+        now = loop.time()
+        self._next_tick_at += delay
+        # 落後超過一個週期時（例如事件迴圈忙碌）不補發，直接從現在重新起算
+        if self._next_tick_at < now:
+            self._next_tick_at = now + delay
+        self._tick_handle = loop.call_at(self._next_tick_at, self._tick, loop)
+
+    def _tick(self, loop: asyncio.AbstractEventLoop) -> None:
+        """定時觸發點（同步函式）：僅在需要時建立處理任務，並排定下一次觸發。"""
+        # 定期在主控台輸出狀態心跳（頻率由日誌節流決定，訊息僅在實際輸出時才格式化）
+        state = self.state
+        self._log(
+            'mock_running',
+            "[模擬] 📊 模擬器運作中 - 手機：%s, 人員：%s, 盒子：%s",
+            False,
+            (state.phone_inserted, state.person_present, state.box_open)
+        )
+
+        if self._step_task is None or self._step_task.done():
+            self._step_task = loop.create_task(self._step())
+        self._schedule_tick(loop, settings.MOCK_INTERVAL_MS / 1000)
+
+    def _wake(self) -> None:
+        """立即觸發一次數據生成，並自此重新起算固定週期。"""
+        if self._tick_handle is None:
+            return
+        self._tick_handle.cancel()
+        loop = asyncio.get_running_loop()
+        self._next_tick_at = loop.time()
+        self._tick(loop)
 
-        loop_count = 0
-        while True:
+    async def _step(self) -> None:
+        """生成並處理一筆模擬訊息；發生錯誤時依指數退避延後下一次觸發。"""
+        try:
+            await self._process_sensor(self._generate_sensor_data())
+        except Exception as e:
+            # 錯誤可能連續發生，依例外類型節流輸出
+            self._log(f'mock_loop_error_{type(e).__name__}', "[模擬錯誤] ❌ %s", False, (e,))
+            if self._tick_handle is not None:
+                self._tick_handle.cancel()
+                loop = asyncio.get_running_loop()
+                self._next_tick_at = loop.time()
+                self._schedule_tick(loop, self._retry_delay)
+                # 持續失敗時逐步拉長間隔；set_state 觸發的 _wake 仍會立即重試
+                self._retry_delay = min(self._retry_delay * 2, self.ERROR_RETRY_MAX_SEC)
+        else:
+            self._retry_delay = self.ERROR_RETRY_INITIAL_SEC
+
+    async def _cancel_ticks(self) -> None:
+        """取消定時排程，並等待仍在執行中的處理任務結束。"""
+        if self._tick_handle is not None:
+            self._tick_handle.cancel()
+            self._tick_handle = None
+
+        task, self._step_task = self._step_task, None
+        if task and not task.done():
+            task.cancel()
             try:
-                loop_count += 1
-
-                # 定期在主控台輸出狀態心跳
-                if loop_count % 20 == 0:
-                    self._log(
-                        'mock_running',
-                        f"[模擬] 📊 模擬器運作中 - 手機：{self.state.phone_inserted}, "
-                        f"人員：{self.state.person_present}, 盒子：{self.state.box_open}",
-                        False
-                    )
-
-                # 生成並處理模擬訊息
-                mock_data = self._generate_sensor_data()
-                await self._process_sensor(mock_data)
-                await asyncio.sleep(settings.MOCK_INTERVAL_MS / 1000)
-
+                await task
             except asyncio.CancelledError:
-                self._log('mock_cancel', "[模擬] ⏹️ 數據生成已停止", True)
-                break
-            except Exception as e:
-                self._log('mock_loop_error', f"[模擬錯誤] ❌ {e}", True)
-                await asyncio.sleep(1)
+                pass
 
-    async def set_state(self, broadcast_state_callback: Callable, **kwargs) -> Dict[str, Any]:
+    async def set_state(self, **kwargs) -> Dict[str, Any]:
         """動態更新模擬硬體的狀態，並廣播變更。"""
         try:
             state_changed = False
+            noise_changed = False
+            state = self.state
+
+            # 噪音下限大於上限時無法建立分貝值產生器，於套用任何欄位前即捨棄這組上下限
+            noise_min = kwargs.get('noise_min', state.noise_min)
+            noise_max = kwargs.get('noise_max', state.noise_max)
+            if noise_min > noise_max:
+                self._log('mock_invalid_noise_range', "[模擬] 警告：噪音下限 %s 大於上限 %s，忽略此範圍設定",
+                          False, (noise_min, noise_max))
+                kwargs.pop('noise_min', None)
+                kwargs.pop('noise_max', None)
+
             for key, value in kwargs.items():
-                if hasattr(self.state, key):
-                    old_value = getattr(self.state, key)
-                    if old_value != value:
-                        setattr(self.state, key, value)
-                        state_changed = True
-                else:
-                    self._log('mock_unknown_attr', f"[模擬] 警告：不支援的屬性名稱 '{key}'", False)
+                if key not in _MOCK_STATE_FIELDS:
+                    self._log('mock_unknown_attr', "[模擬] 警告：不支援的屬性名稱 '%s'", False, (key,))
+                    continue
+                if getattr(state, key) != value:
+                    setattr(state, key, value)
+                    state_changed = True
+                    if key in ('noise_min', 'noise_max'):
+                        noise_changed = True
 
             if not state_changed:
                 return self.state.to_dict()
+            # 欄位已變動，使 to_dict() 的快取失效
+            state._dict_view = None
+
+            # 噪音上下限變動時才重建分貝值產生器
+            if noise_changed:
+                self._mic_gen = self._build_mic_generator()
 
             self._log(
                 'mock_state_update',
@@ -243,11 +360,10 @@ class MockHardwareController:
             # 更新硬體摘要資訊
             await self._broadcast_event('hardware_status', self._build_status())
 
-            # 若模擬器正在執行，立刻強制生成一筆新數據以加快反應速度
+            # 若模擬器正在執行，提前觸發下一次排程以加快反應速度；
+            # 數據處理與狀態廣播沿用排程本身的流程，不另外重複執行
             if self.active:
-                mock_data = self._generate_sensor_data()
-                await self._process_sensor(mock_data)
-                await broadcast_state_callback()
+                self._wake()
 
             return self.state.to_dict()
 
@@ -1,4 +1,4 @@
-﻿from pydantic import BaseModel
+﻿from pydantic import BaseModel, ConfigDict
 from typing import Optional, List
 from enum import Enum
 from datetime import datetime
@@ -87,7 +87,13 @@ class SensorData(BaseModel):
 
 
 class PenaltyConfig(BaseModel):
-    """細粒度的懲罰觸發配置：定義哪些感測器行為會觸發違規。"""
+    """細粒度的懲罰觸發配置：定義哪些感測器行為會觸發違規。
+
+    配置為不可變物件，變更時一律建立新實例，因此全域設定與各任務可安全共用同一物件，
+    以物件身分快取的違規檢查清單也不會因欄位被就地修改而過期。
+    """
+    model_config = ConfigDict(frozen=True)
+
     enable_phone_penalty: bool = True     # 是否啟用手機移出懲罰
     enable_presence_penalty: bool = True  # 是否啟用人員離位懲罰
     enable_noise_penalty: bool = True     # 是否啟用噪音超標懲罰
@@ -142,12 +142,15 @@ class ProgressivePenaltyManager:
 
         safe_print(f"[懲罰系統] 🚨 執行懲罰程序")
 
-        # 執行所有懲罰回呼
-        for callback in self._penalty_callbacks:
-            try:
-                await callback(PenaltyLevel.PENALTY, self.state.count, reason)
-            except Exception as e:
-                safe_print(f"[懲罰系統] 執行懲罰回呼時發生錯誤: {e}")
+        # 並行執行所有懲罰回呼，個別回呼失敗不影響其他回呼
+        results = await asyncio.gather(
+            *(callback(PenaltyLevel.PENALTY, self.state.count, reason)
+              for callback in self._penalty_callbacks),
+            return_exceptions=True
+        )
+        for result in results:
+            if isinstance(result, Exception):
+                safe_print(f"[懲罰系統] 執行懲罰回呼時發生錯誤: {result}")
 
         # 廣播執行結果至前端
         if self._broadcast_callback:
@@ -1,11 +1,18 @@
 ﻿"""硬體控制與狀態查詢路由。"""
-from fastapi import APIRouter
+from typing import Any, Dict, Optional
+
+import orjson
+from fastapi import APIRouter, Response
+from fastapi.responses import ORJSONResponse
 from pydantic import BaseModel
 
 from ..socket_manager import socket_manager
 from ..schemas import success_response
 
-router = APIRouter(prefix="/api/hardware", tags=["hardware"])
+router = APIRouter(prefix="/api/hardware", tags=["hardware"], default_response_class=ORJSONResponse)
+
+# 硬體狀態回應的編碼快取：(對應的快照物件, 已編碼的 JSON 位元組)
+_status_body_cache: Optional[tuple[Dict[str, Any], bytes]] = None
 
 
 class MockControlRequest(BaseModel):
@@ -16,24 +23,14 @@ class MockControlRequest(BaseModel):
 @router.get("/status")
 async def get_hardware_status():
     """獲取當前硬體連線狀態與感測器偵測情形 (v1.0)。"""
-    # 呼叫輔助方法以取得一致的感測器偵測狀態
-    nfc_detected, ldr_detected, radar_detected = socket_manager.get_sensor_detection_status()
-
-    return success_response({
-        "connected": socket_manager.hardware_connected,
-        "mock_mode": socket_manager.mock_mode_active,
-        "mock_state": socket_manager.mock_state.to_dict(),
-        "last_sensor_data": socket_manager.state.last_sensor_data.model_dump()
-            if socket_manager.state.last_sensor_data else None,
-        "nfc_detected": nfc_detected,
-        "ldr_detected": ldr_detected,
-        "hall_detected": ldr_detected,  # v1.0：霍爾感測器與 LDR 共用邏輯位
-        "ir_detected": ldr_detected,    # 提供 ir_detected 以維持前端相容性
-        "radar_detected": radar_detected,
-        "lcd_detected": 'lcd' in socket_manager.hardware_features,
-        "hardware_state": socket_manager.state.hardware_state.value,
-        "firmware_version": socket_manager.hardware_firmware_version
-    })
+    global _status_body_cache
+
+    # 快照在狀態變動時會被替換為新物件，同一份快照只需編碼一次
+    snapshot = socket_manager.snapshot()
+    if _status_body_cache is None or _status_body_cache[0] is not snapshot:
+        body = orjson.dumps(success_response(snapshot['hardware']))
+        _status_body_cache = (snapshot, body)
+    return Response(_status_body_cache[1], media_type="application/json")
 
 
 @router.post("/mock/start")
@@ -1,19 +1,24 @@
 ﻿"""人質協定證據管理路由。"""
-import json
+import asyncio
 import os
-import shutil
 import uuid
 from pathlib import Path
-from typing import List
+from typing import Dict, List, Optional, Set
 
+import aiofiles
+import aiofiles.os
+import orjson
 from fastapi import APIRouter, File, HTTPException, UploadFile
+from fastapi.responses import ORJSONResponse
+from fastapi.staticfiles import StaticFiles
 from pydantic import BaseModel
 
-from ..logger import safe_print
+from ..logger import logger
 
-router = APIRouter(prefix="/api/hostage", tags=["hostage"])
+router = APIRouter(prefix="/api/hostage", tags=["hostage"], default_response_class=ORJSONResponse)
 
 # 定義人質照片存放目錄
+# 注意：主要執行環境為 Windows，不支援 dir_fd / O_DIRECTORY，因此一律以完整路徑存取
 HOSTAGE_DIR = Path(__file__).parent.parent.parent / "hostage_evidence"
 HOSTAGE_DIR.mkdir(parents=True, exist_ok=True)
 
@@ -21,6 +26,28 @@ HOSTAGE_DIR.mkdir(parents=True, exist_ok=True)
 METADATA_FILE = HOSTAGE_DIR / "metadata.json"
 MAX_IMAGES = 30
 
+# 上傳檔案時每次讀寫的區塊大小 (64 KiB)
+UPLOAD_CHUNK_SIZE = 1 << 16
+
+# 照片靜態檔案的掛載路徑（由 main.py 掛載 HostageStaticFiles）
+HOSTAGE_FILES_PATH = "/api/hostage/files"
+
+# 中繼資料的記憶體快取，以檔案修改時間 (ns) 判斷是否需要重新讀取
+_META_CACHE: Optional[dict] = None
+_META_MTIME_NS: int = -1
+
+# 隨快取維護的索引：已選取的照片 ID 與各照片實體檔案是否存在
+# 僅在重新讀取中繼資料時才對檔案做 stat，其餘由上傳、切換、刪除增量更新
+_SELECTED_IDS: Set[str] = set()
+_FILE_EXISTS: Dict[str, bool] = {}
+
+# 中繼資料延遲寫入：短時間內的多次修改合併為一次寫檔
+METADATA_FLUSH_DELAY_SEC = 0.1
+# 寫入失敗後重試的間隔，避免磁碟持續異常時密集重試
+METADATA_RETRY_DELAY_SEC = 1.0
+_META_DIRTY: bool = False
+_META_FLUSH_TASK: Optional[asyncio.Task] = None
+
 
 class HostageImage(BaseModel):
     """單張人質照片的資料結構。"""
@@ -37,56 +64,153 @@ class HostageListResponse(BaseModel):
     selected_count: int
 
 
+class HostageStaticFiles(StaticFiles):
+    """直接由 Starlette 提供照片檔案，僅限中繼資料中登記的照片。
+
+    目錄內的其他檔案（中繼資料、任務人質照片 hostage.jpg、上傳暫存檔等）一律回傳 404。
+    """
+
+    async def get_response(self, path, scope):
+        # 檔名格式為「照片 ID + 副檔名」，以 ID 查詢中繼資料並比對完整檔名
+        image_id = Path(path).stem
+        data = load_metadata().get(image_id)
+        if data is None or data['filename'] != path or not _FILE_EXISTS.get(image_id, False):
+            raise HTTPException(status_code=404, detail="找不到指定的照片。")
+        return await super().get_response(path, scope)
+
+
 def load_metadata() -> dict:
-    """從 JSON 檔案載入照片中繼資料，用於維護選取狀態與原始名稱。"""
-    if METADATA_FILE.exists():
-        with open(METADATA_FILE, 'r', encoding='utf-8') as f:
-            return json.load(f)
-    return {}
+    """從 JSON 檔案載入照片中繼資料，用於維護選取狀態與原始名稱。
+
+    檔案未變動時直接回傳記憶體中的快取，呼叫端修改後須透過 save_metadata 寫回。
+    """
+    global _META_CACHE, _META_MTIME_NS
+
+    # 尚有未寫入磁碟的修改時，記憶體內容才是最新版本
+    if _META_DIRTY and _META_CACHE is not None:
+        return _META_CACHE
+
+    try:
+        mtime_ns = METADATA_FILE.stat().st_mtime_ns
+    except FileNotFoundError:
+        if _META_CACHE is None or _META_MTIME_NS != -1:
+            _META_CACHE, _META_MTIME_NS = {}, -1
+            _rebuild_index(_META_CACHE)
+        return _META_CACHE
+
+    if _META_CACHE is None or mtime_ns != _META_MTIME_NS:
+        _META_CACHE = orjson.loads(METADATA_FILE.read_bytes())
+        _META_MTIME_NS = mtime_ns
+        _rebuild_index(_META_CACHE)
+    return _META_CACHE
+
+
+def _rebuild_index(metadata: dict) -> None:
+    """依據中繼資料重建選取索引與檔案存在表。
+
+    以單次 os.scandir 列出目錄內的檔案，取代逐張照片的 stat 呼叫。
+    """
+    with os.scandir(HOSTAGE_DIR) as entries:
+        present = {entry.name for entry in entries if entry.is_file()}
+
+    _FILE_EXISTS.clear()
+    _SELECTED_IDS.clear()
+    for image_id, data in metadata.items():
+        _FILE_EXISTS[image_id] = data['filename'] in present
+        if data.get('selected', False):
+            _SELECTED_IDS.add(image_id)
 
 
 def save_metadata(metadata: dict):
-    """將最新的照片中繼資料持久化至磁碟。"""
-    with open(METADATA_FILE, 'w', encoding='utf-8') as f:
-        json.dump(metadata, f, ensure_ascii=False, indent=2)
+    """更新中繼資料快取，並排程於短暫延遲後寫回磁碟。
+
+    延遲期間的多次修改會合併為一次寫檔；若目前沒有執行中的事件迴圈則立即寫入。
+    """
+    global _META_CACHE, _META_DIRTY, _META_FLUSH_TASK
+
+    _META_CACHE = metadata
+    _META_DIRTY = True
+
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        flush_metadata()
+        return
+
+    if _META_FLUSH_TASK is None or _META_FLUSH_TASK.done():
+        _META_FLUSH_TASK = loop.create_task(_delayed_flush())
+
+
+async def _delayed_flush(delay: float = METADATA_FLUSH_DELAY_SEC) -> None:
+    """等待合併視窗結束後將中繼資料寫回磁碟，失敗時排程稍後重試。"""
+    global _META_FLUSH_TASK
+
+    await asyncio.sleep(delay)
+    try:
+        flush_metadata()
+    except Exception as e:
+        logger.error("[人質協定] 中繼資料寫入失敗，將於 %g 秒後重試：%s", METADATA_RETRY_DELAY_SEC, e)
+        # 修改仍保留在記憶體中（尚未寫入標記不變），重新排程直到寫入成功或伺服器關閉時再次嘗試
+        _META_FLUSH_TASK = asyncio.get_running_loop().create_task(_delayed_flush(METADATA_RETRY_DELAY_SEC))
+
+
+def flush_metadata() -> None:
+    """立即將尚未寫入的中繼資料以原子方式寫回磁碟（亦於伺服器關閉時呼叫）。"""
+    global _META_MTIME_NS, _META_DIRTY
+
+    if not _META_DIRTY or _META_CACHE is None:
+        return
+
+    tmp_file = METADATA_FILE.with_suffix(".tmp")
+    try:
+        tmp_file.write_bytes(orjson.dumps(_META_CACHE))
+        os.replace(tmp_file, METADATA_FILE)
+    except Exception:
+        # 寫入失敗時僅清除暫存檔；快取與尚未寫入標記保留，已回應成功的修改不會遺失
+        tmp_file.unlink(missing_ok=True)
+        raise
+
+    _META_DIRTY = False
+    _META_MTIME_NS = METADATA_FILE.stat().st_mtime_ns
 
 
 def get_selected_images() -> List[str]:
-    """獲取目前所有標記為「已選取」的照片實體路徑。"""
+    """獲取目前所有標記為「已選取」的照片實體路徑（直接查詢索引，不逐一 stat）。"""
     metadata = load_metadata()
-    selected = []
-    for image_id, data in metadata.items():
-        if data.get('selected', False):
-            image_path = HOSTAGE_DIR / data['filename']
-            if image_path.exists():
-                selected.append(str(image_path))
-    return selected
+    return [
+        str(HOSTAGE_DIR / metadata[image_id]['filename'])
+        for image_id in _SELECTED_IDS
+        if _FILE_EXISTS.get(image_id, False)
+    ]
 
 
-@router.get("/images", response_model=HostageListResponse)
+# 回傳內容已符合 HostageListResponse 結構，僅保留於 OpenAPI 文件中，
+# 不使用 response_model 以省去額外的驗證與 jsonable_encoder 序列化
+@router.get("/images", responses={200: {"model": HostageListResponse}})
 async def list_images():
     """獲取所有已上傳照片的清單，含 ID 與預覽 URL。"""
     metadata = load_metadata()
     images = []
     selected_count = 0
 
+    # 直接建立符合 HostageImage 結構的字典，避免逐張建構 Pydantic 實例
     for image_id, data in metadata.items():
-        image_path = HOSTAGE_DIR / data['filename']
-        if image_path.exists():
-            images.append(HostageImage(
-                id=image_id,
-                filename=data['filename'],
-                selected=data.get('selected', False),
-                url=f"/api/hostage/image/{image_id}"
-            ))
-            if data.get('selected', False):
+        if _FILE_EXISTS.get(image_id, False):
+            selected = data.get('selected', False)
+            images.append({
+                "id": image_id,
+                "filename": data['filename'],
+                "selected": selected,
+                "url": f"{HOSTAGE_FILES_PATH}/{data['filename']}"
+            })
+            if selected:
                 selected_count += 1
 
-    return {
+    return ORJSONResponse({
         "images": images,
         "total": len(images),
         "selected_count": selected_count
-    }
+    })
 
 
 @router.post("/upload")
@@ -96,9 +220,8 @@ async def upload_image(file: UploadFile = File(...)):
     if not file.content_type or not file.content_type.startswith('image/'):
         raise HTTPException(status_code=400, detail="此功能僅支援上傳圖片檔案。")
 
-    # 防止伺服器空間遭惡意佔用
-    metadata = load_metadata()
-    if len(metadata) >= MAX_IMAGES:
+    # 防止伺服器空間遭惡意佔用：在寫入任何檔案內容前先檢查配額
+    if len(load_metadata()) >= MAX_IMAGES:
         raise HTTPException(status_code=400, detail=f"已達上傳上限，系統最多僅能保存 {MAX_IMAGES} 張人質照片。")
 
     # 使用 UUID 生成混淆過的檔名
@@ -107,12 +230,21 @@ async def upload_image(file: UploadFile = File(...)):
     filename = f"{image_id}{file_ext}"
     file_path = HOSTAGE_DIR / filename
 
+    # 以非同步分塊方式寫入，避免大型檔案阻塞事件迴圈
     try:
-        with open(file_path, "wb") as buffer:
-            shutil.copyfileobj(file.file, buffer)
+        async with aiofiles.open(file_path, "wb") as buffer:
+            while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+                await buffer.write(chunk)
     except Exception as e:
+        file_path.unlink(missing_ok=True)
         raise HTTPException(status_code=500, detail=f"寫入檔案時發生錯誤：{str(e)}")
 
+    # 寫檔期間其他上傳請求可能已完成並佔用配額，寫入中繼資料前須再次檢查
+    metadata = load_metadata()
+    if len(metadata) >= MAX_IMAGES:
+        file_path.unlink(missing_ok=True)
+        raise HTTPException(status_code=400, detail=f"已達上傳上限，系統最多僅能保存 {MAX_IMAGES} 張人質照片。")
+
     # 新上傳的圖片預設為啟用狀態
     metadata[image_id] = {
         'filename': filename,
@@ -120,8 +252,10 @@ async def upload_image(file: UploadFile = File(...)):
         'selected': True
     }
     save_metadata(metadata)
+    _FILE_EXISTS[image_id] = True
+    _SELECTED_IDS.add(image_id)
 
-    safe_print(f"[人質協定] 成功接收新照片：{filename} (ID: {image_id})")
+    logger.info("[人質協定] 成功接收新照片：%s (ID: %s)", filename, image_id)
 
     return {
         "success": True,
@@ -143,6 +277,10 @@ async def toggle_selection(image_id: str):
 
     metadata[image_id]['selected'] = not metadata[image_id].get('selected', False)
     save_metadata(metadata)
+    if metadata[image_id]['selected']:
+        _SELECTED_IDS.add(image_id)
+    else:
+        _SELECTED_IDS.discard(image_id)
 
     return {
         "success": True,
@@ -161,26 +299,29 @@ async def delete_image(image_id: str):
     if image_id not in metadata:
         raise HTTPException(status_code=404, detail="找不到指定的照片紀錄。")
 
-    # 執行實體檔案刪除
+    # 執行實體檔案刪除（於執行緒池中進行，避免阻塞事件迴圈）
     image_path = HOSTAGE_DIR / metadata[image_id]['filename']
-    if image_path.exists():
-        try:
-            os.remove(image_path)
-        except Exception as e:
-            raise HTTPException(status_code=500, detail=f"無法刪除實體檔案：{str(e)}")
+    try:
+        await aiofiles.os.remove(image_path)
+    except FileNotFoundError:
+        pass
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"無法刪除實體檔案：{str(e)}")
 
     # 同步更新中繼資料
     del metadata[image_id]
     save_metadata(metadata)
+    _FILE_EXISTS.pop(image_id, None)
+    _SELECTED_IDS.discard(image_id)
 
-    safe_print(f"[人質協定] 照片資料已清除：{image_id}")
+    logger.info("[人質協定] 照片資料已清除：%s", image_id)
 
     return {"success": True, "message": "照片已從系統中移除。"}
 
 
 @router.get("/image/{image_id}")
 async def get_image(image_id: str):
-    """回傳原始圖片檔案（供前端預覽使用）。"""
+    """依照片 ID 回傳原始圖片檔案（舊版介面，新版前端直接使用靜態檔案路徑）。"""
     from fastapi.responses import FileResponse
 
     metadata = load_metadata()
@@ -201,10 +342,10 @@ async def get_selected():
     """內部介面：獲取所有目前生效中的處罰素材列表。"""
     selected = get_selected_images()
 
-    return {
+    return ORJSONResponse({
         "success": True,
         "data": {
             "count": len(selected),
             "images": selected
         }
-    }
+    })
@@ -4,21 +4,16 @@
 提供前端動畫完成後觸發實際懲罰發送的端點。
 """
 
-from fastapi import APIRouter, HTTPException
+import orjson
+from fastapi import APIRouter, HTTPException, Response
+from fastapi.responses import ORJSONResponse
 from pydantic import BaseModel
-from typing import Optional
 
 from ..automation.social_manager import social_manager
-from ..logger import safe_print
+from ..logger import logger
 
 
-router = APIRouter(prefix="/api/penalty", tags=["penalty"])
-
-
-class ExecutePenaltyRequest(BaseModel):
-    """執行懲罰的請求參數"""
-    # 可選：未來可擴展傳入額外參數
-    pass
+router = APIRouter(prefix="/api/penalty", tags=["penalty"], default_response_class=ORJSONResponse)
 
 
 class ExecutePenaltyResponse(BaseModel):
@@ -28,7 +23,23 @@ class ExecutePenaltyResponse(BaseModel):
     platforms_executed: int
 
 
-@router.post("/execute", response_model=ExecutePenaltyResponse)
+# 不需執行懲罰時的固定回應內容，於模組載入時預先編碼
+# 每次請求仍建立新的 Response，避免在請求間共用可變的回應物件
+_NOT_CONFIGURED_BODY = orjson.dumps({
+    "success": False,
+    "message": "尚未配置處罰機制",
+    "platforms_executed": 0
+})
+_NO_PLATFORM_BODY = orjson.dumps({
+    "success": False,
+    "message": "未啟用任何處罰平台",
+    "platforms_executed": 0
+})
+
+
+# 回傳內容已符合 ExecutePenaltyResponse 結構，僅保留於 OpenAPI 文件中，
+# 不使用 response_model 以省去額外的驗證與 jsonable_encoder 序列化
+@router.post("/execute", responses={200: {"model": ExecutePenaltyResponse}})
 async def execute_penalty():
     """
     執行懲罰發送。
@@ -37,7 +48,7 @@ async def execute_penalty():
     用於觸發實際的社交平台訊息發送。
     """
     try:
-        safe_print("[懲罰 API] 收到前端請求，開始執行社交羞恥發送...")
+        logger.info("[懲罰 API] 收到前端請求，開始執行社交羞恥發送...")
         
         # 從 socket_manager 獲取當前系統狀態
         from ..socket_manager import socket_manager
@@ -47,33 +58,26 @@ async def execute_penalty():
             raise HTTPException(status_code=400, detail="系統狀態未初始化")
         
         if not state.penalty_settings:
-            return ExecutePenaltyResponse(
-                success=False,
-                message="尚未配置處罰機制",
-                platforms_executed=0
-            )
+            return Response(_NOT_CONFIGURED_BODY, media_type="application/json")
         
         enabled = state.penalty_settings.enabled_platforms
         if not enabled:
-            return ExecutePenaltyResponse(
-                success=False,
-                message="未啟用任何處罰平台",
-                platforms_executed=0
-            )
+            return Response(_NO_PLATFORM_BODY, media_type="application/json")
         
         # 執行實際的懲罰發送
         await social_manager.execute_penalty(state)
+        count = len(enabled)
         
-        safe_print(f"[懲罰 API] ✅ 社交羞恥發送完成，涉及 {len(enabled)} 個平台")
+        logger.info("[懲罰 API] ✅ 社交羞恥發送完成，涉及 %d 個平台", count)
         
-        return ExecutePenaltyResponse(
-            success=True,
-            message=f"已向 {len(enabled)} 個平台發送懲罰通知",
-            platforms_executed=len(enabled)
-        )
+        return ORJSONResponse({
+            "success": True,
+            "message": f"已向 {count} 個平台發送懲罰通知",
+            "platforms_executed": count
+        })
         
     except HTTPException:
         raise
     except Exception as e:
-        safe_print(f"[懲罰 API] ❌ 執行失敗: {e}")
+        logger.error("[懲罰 API] ❌ 執行失敗: %s", e)
         raise HTTPException(status_code=500, detail=f"懲罰執行失敗: {str(e)}")
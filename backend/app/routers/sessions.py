@@ -1,23 +1,22 @@
 ﻿"""專注協定任務管理路由。"""
-import os
-import shutil
 from pathlib import Path
 from typing import Optional
 
+import aiofiles
+import aiofiles.os
 from fastapi import APIRouter, File, Form, HTTPException, Query, UploadFile
+from fastapi.responses import ORJSONResponse
 from pydantic import BaseModel
 
 from ..socket_manager import socket_manager
 from ..models import SessionStatus
-from ..logger import safe_print
+from ..logger import logger
 from ..schemas import success_response
 from ..session_store import session_store
+# 人質照片目錄統一由 hostage 路由模組定義並建立
+from .hostage import HOSTAGE_DIR, UPLOAD_CHUNK_SIZE
 
-router = APIRouter(prefix="/api/sessions", tags=["sessions"])
-
-# 定義人質照片存放路徑
-HOSTAGE_DIR = Path(__file__).parent.parent.parent / "hostage_evidence"
-HOSTAGE_DIR.mkdir(parents=True, exist_ok=True)
+router = APIRouter(prefix="/api/sessions", tags=["sessions"], default_response_class=ORJSONResponse)
 
 
 class StartSessionRequest(BaseModel):
@@ -30,21 +29,32 @@ def get_hostage_path() -> Path:
     return HOSTAGE_DIR / "hostage.jpg"
 
 
-def save_hostage_image(file: UploadFile) -> str:
-    """將上傳的人質照片儲存至磁碟，並回傳儲存路徑。"""
+async def save_hostage_image(file: UploadFile) -> str:
+    """將上傳的人質照片儲存至磁碟，並回傳儲存路徑。
+
+    先以非同步分塊寫入暫存檔，完成後再以 replace 原子性地取代舊照片。
+    """
     hostage_path = get_hostage_path()
-    with open(hostage_path, "wb") as buffer:
-        shutil.copyfileobj(file.file, buffer)
-    safe_print(f"[人質協定] 人質照片已就緒，路徑: {hostage_path}")
+    tmp_path = hostage_path.with_suffix(".tmp")
+    try:
+        async with aiofiles.open(tmp_path, "wb") as buffer:
+            while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+                await buffer.write(chunk)
+        await aiofiles.os.replace(tmp_path, hostage_path)
+    except Exception:
+        tmp_path.unlink(missing_ok=True)
+        raise
+    logger.info("[人質協定] 人質照片已就緒，路徑: %s", hostage_path)
     return str(hostage_path)
 
 
-def delete_hostage_image():
+async def delete_hostage_image():
     """任務圓滿達成後，銷毀人質照片。"""
-    hostage_path = get_hostage_path()
-    if hostage_path.exists():
-        os.remove(hostage_path)
-        safe_print("[人質協定] 專注成功！人質照片已按規定銷毀。")
+    try:
+        await aiofiles.os.remove(get_hostage_path())
+    except FileNotFoundError:
+        return
+    logger.info("[人質協定] 專注成功！人質照片已按規定銷毀。")
 
 
 def get_hostage_image_if_exists() -> Optional[str]:
@@ -67,7 +77,7 @@ async def start_session(
 
     hostage_path = None
     if hostage_image and hostage_image.filename:
-        hostage_path = save_hostage_image(hostage_image)
+        hostage_path = await save_hostage_image(hostage_image)
 
     # 調用核心控制器啟動任務
     await socket_manager.start_focus_session(duration_minutes, hostage_path)
@@ -90,7 +100,7 @@ async def stop_session():
 
     # 任務完成後，移除人質照片
     if session_completed:
-        delete_hostage_image()
+        await delete_hostage_image()
 
     message = "專注任務已圓滿結束。" if session_completed else "專注任務已因違規而被中止。"
     return success_response(message=message)
@@ -131,14 +141,10 @@ async def resume_session():
 @router.get("/current")
 async def get_current_session():
     """查詢當前任務的詳細狀態與環境監測數據。"""
-    return success_response({
-        "session": socket_manager.state.session.model_dump() if socket_manager.state.session else None,
-        "phone_status": socket_manager.state.phone_status,
-        "presence_status": socket_manager.state.presence_status,
-        "current_db": socket_manager.state.current_db,
-        "hardware_state": socket_manager.state.hardware_state.value,
+    return ORJSONResponse(success_response({
+        **socket_manager.snapshot()['session'],
         "hostage_uploaded": get_hostage_image_if_exists() is not None
-    })
+    }))
 
 
 @router.get("/hostage-status")
@@ -171,7 +177,7 @@ async def get_session_history(
 
     return success_response({
         "sessions": [r.model_dump() for r in records],
-        "total": len(session_store._history),
+        "total": session_store.count(),
         "limit": limit,
         "offset": offset
     })
@@ -181,5 +187,5 @@ async def get_session_history(
 async def get_session_statistics():
     """查詢專注成效統計 (完成率、累計專注時間等)。"""
     stats = session_store.get_statistics()
-    return success_response(stats)
+    return ORJSONResponse(success_response(stats))
 
@@ -1,26 +1,49 @@
 ﻿"""社交平台整合路由，用於設定與執行違規罰則。"""
-from typing import List
+import asyncio
+import string
+import time
+from typing import Annotated, Any, Awaitable, Callable, Dict, Optional
 
-from fastapi import APIRouter, HTTPException
-from pydantic import BaseModel
+import orjson
+from fastapi import APIRouter, Body, HTTPException, Response
+from fastapi.exceptions import RequestValidationError
+from fastapi.responses import ORJSONResponse
+from pydantic import BaseModel, StringConstraints, ValidationError, field_validator
 
 from ..models import SocialPlatform, PenaltySettings
 from ..socket_manager import socket_manager
 from ..automation.social_manager import social_manager
 from ..credential_store import credential_store
 from ..config import settings
+from ..logger import logger
 from ..schemas import success_response
+from .sessions import get_hostage_image_if_exists
 
-router = APIRouter(prefix="/api/social", tags=["social"])
+router = APIRouter(prefix="/api/social", tags=["social"], default_response_class=ORJSONResponse)
 
+# 憑證格式驗證規則，交由請求模型在解析請求本體時一併檢查，格式錯誤時自動回傳 422
+# Gmail 地址以 (?i) 不分大小寫比對，避免為了比對而另外建立小寫字串
+_GMAIL_PATTERN = r'(?i)^[a-zA-Z0-9._%+-]+@gmail\.com$'
+# 應用程式密碼允許夾雜空白（Google 以空格分組顯示），單次比對即可確認恰為 16 個英文字母
+_GMAIL_APP_PASSWORD_PATTERN = r'^\s*(?:[A-Za-z]\s*){16}$'
+_THREADS_USER_ID_PATTERN = r'^\d+$'
+# Discord Webhook 格式為 https://discord.com/api/webhooks/<數字 ID>/<Token>，以字串操作檢查即可
+_DISCORD_WEBHOOK_PREFIX = "https://discord.com/api/webhooks/"
+_DISCORD_WEBHOOK_TOKEN_CHARS = frozenset(string.ascii_letters + string.digits + "_-")
 
-class PenaltySettingsRequest(BaseModel):
-    """更新處罰設定的請求模型。"""
-    enabled_platforms: List[str]
-    custom_messages: dict
-    gmail_recipients: List[str] = []
-    include_timestamp: bool = True
-    include_violation_count: bool = True
+# 處罰設定序列化結果的快取：(對應的設定物件, model_dump 結果)
+# 設定更新時會整個替換為新物件，因此以物件身分判斷快取是否仍有效
+_settings_dump_cache: Optional[tuple[PenaltySettings, Dict[str, Any]]] = None
+
+# /login-status 的短效快取：(建立時間, 狀態字典)
+# 儀表板會持續輪詢，TTL 內的重複請求直接沿用結果；憑證變更時立即作廢
+LOGIN_STATUS_TTL_SEC = 5.0
+_login_status_cache: Optional[tuple[float, Dict[str, bool]]] = None
+# 每次作廢時遞增，避免查詢期間發生的憑證變更被較舊的結果覆蓋
+_login_status_generation = 0
+
+# 平台名稱對照表，以單次字典查詢取代每次請求建構列舉並捕捉 ValueError
+_PLATFORM_MAP = {p.value: p for p in SocialPlatform}
 
 
 class TestPostRequest(BaseModel):
@@ -31,54 +54,192 @@ class TestPostRequest(BaseModel):
 
 class GmailCredentialsRequest(BaseModel):
     """Gmail 憑證請求模型。"""
-    email: str
-    app_password: str
+    # 需為 @gmail.com 結尾的有效地址
+    email: Annotated[str, StringConstraints(pattern=_GMAIL_PATTERN)]
+    # 應用程式密碼應為 16 位英文字母（不含空格）
+    app_password: Annotated[str, StringConstraints(pattern=_GMAIL_APP_PASSWORD_PATTERN)]
+
+    @field_validator('app_password')
+    @classmethod
+    def _remove_whitespace(cls, value: str) -> str:
+        """格式驗證通過後，移除分組用的空白。"""
+        return ''.join(value.split())
 
 
 class ThreadsCredentialsRequest(BaseModel):
     """Threads API 憑證請求模型 (進階)。"""
-    user_id: str
-    access_token: str
+    # User ID 應為純數字
+    user_id: Annotated[str, StringConstraints(strip_whitespace=True, pattern=_THREADS_USER_ID_PATTERN)]
+    # Access Token 僅做基本長度檢查
+    access_token: Annotated[str, StringConstraints(strip_whitespace=True, min_length=20)]
 
 
 class ThreadsBrowserLoginRequest(BaseModel):
     """Threads 瀏覽器登入請求模型（簡化版）。"""
-    username: str
-    password: str
+    # 去除前後空白後不可為空
+    username: Annotated[str, StringConstraints(strip_whitespace=True, min_length=1)]
+    password: Annotated[str, StringConstraints(strip_whitespace=True, min_length=1)]
+
+
+def _is_valid_discord_webhook(url: str) -> bool:
+    """確認網址為 Discord Webhook 格式（前綴、數字 ID 與僅含英數及 _- 的 Token）。"""
+    if not url.startswith(_DISCORD_WEBHOOK_PREFIX):
+        return False
+    webhook_id, slash, token = url[len(_DISCORD_WEBHOOK_PREFIX):].partition("/")
+    return (
+        bool(slash and token)
+        and webhook_id.isascii() and webhook_id.isdigit()
+        and _DISCORD_WEBHOOK_TOKEN_CHARS.issuperset(token)
+    )
 
 
 class DiscordCredentialsRequest(BaseModel):
     """Discord Webhook 憑證請求模型。"""
-    webhook_url: str
+    webhook_url: Annotated[str, StringConstraints(strip_whitespace=True)]
+
+    @field_validator('webhook_url')
+    @classmethod
+    def _check_webhook_format(cls, value: str) -> str:
+        """驗證 Webhook 網址格式。"""
+        if not _is_valid_discord_webhook(value):
+            raise ValueError("Discord Webhook URL 格式錯誤：應為 https://discord.com/api/webhooks/... 格式")
+        return value
+
+
+def _parse_platform(name: str) -> SocialPlatform:
+    """將路徑參數中的平台名稱轉換為 SocialPlatform，未知平台時回傳 400。"""
+    plat = _PLATFORM_MAP.get(name)
+    if plat is None:
+        raise HTTPException(status_code=400, detail=f"未知平台：{name}")
+    return plat
+
+
+# 背景廣播任務的強參照，避免任務在完成前被垃圾回收
+_background_tasks: set[asyncio.Task] = set()
+
+
+def _on_background_task_done(task: asyncio.Task) -> None:
+    """背景任務結束時移除參照並記錄例外。"""
+    _background_tasks.discard(task)
+    if not task.cancelled() and task.exception() is not None:
+        logger.error("[社交平台] 背景廣播失敗：%s", task.exception())
+
+
+def _broadcast_state_in_background() -> None:
+    """於背景廣播最新狀態，HTTP 回應不必等待所有 WebSocket 用戶端送出完成。"""
+    task = asyncio.create_task(socket_manager.broadcast_state(force=True))
+    _background_tasks.add(task)
+    task.add_done_callback(_on_background_task_done)
+
+
+def _invalidate_login_status() -> None:
+    """憑證變更後作廢登入狀態快取，確保下次查詢即反映最新狀態。"""
+    global _login_status_cache, _login_status_generation
+    _login_status_cache = None
+    _login_status_generation += 1
+
+
+# 憑證檔案的讀寫會阻塞，一律交由執行緒池執行；執行期設定則於事件迴圈上直接更新
+
+async def _clear_gmail() -> None:
+    """清除 Gmail 憑證檔案與執行期設定。"""
+    await asyncio.to_thread(credential_store.clear_gmail)
+    settings.GMAIL_USER = None
+    settings.GMAIL_APP_PASSWORD = None
+
+
+async def _clear_threads() -> None:
+    """清除 Threads 憑證檔案與執行期設定。"""
+    await asyncio.to_thread(credential_store.clear_threads)
+    settings.THREADS_USER_ID = None
+    settings.THREADS_ACCESS_TOKEN = None
+
+
+async def _clear_discord() -> None:
+    """清除 Discord Webhook 憑證檔案與執行期設定。"""
+    await asyncio.to_thread(credential_store.clear_discord)
+    settings.DISCORD_WEBHOOK_URL = None
+
+
+# 各平台登出時的資源清理函式
+_LOGOUT_HANDLERS: Dict[SocialPlatform, Callable[[], Awaitable[None]]] = {
+    SocialPlatform.GMAIL: _clear_gmail,
+    SocialPlatform.THREADS: _clear_threads,
+    SocialPlatform.DISCORD: _clear_discord,
+}
+
+# 各平台已設定時可公開的憑證摘要（僅含非敏感欄位）
+_CREDENTIAL_INFO: Dict[SocialPlatform, Callable[[], dict]] = {
+    SocialPlatform.GMAIL: lambda: {"email": settings.GMAIL_USER},
+    SocialPlatform.THREADS: lambda: {"user_id": settings.THREADS_USER_ID},
+    SocialPlatform.DISCORD: lambda: {"webhook_configured": True},
+}
+
+
+def _open_login_body(plat: SocialPlatform) -> bytes:
+    """產生 open_login 針對指定平台的固定回應內容。"""
+    if plat == SocialPlatform.DISCORD:
+        return orjson.dumps(success_response(
+            message=f"{plat.value} 採 Webhook URL 配置。請直接在下方輸入網址。"
+        ))
+    return orjson.dumps(success_response(
+        message=f"{plat.value} 目前僅支援直接憑證設定。請於 .env 檔案中進行配置。",
+        data={"configured": False}
+    ))
+
+
+# 登入引導與 Session 保存的回應僅與平台及是否已設定有關，於模組載入時預先編碼
+_OPEN_LOGIN_BODIES: Dict[SocialPlatform, bytes] = {
+    p: _open_login_body(p) for p in SocialPlatform
+}
+_SAVE_SESSION_BODIES: Dict[tuple[SocialPlatform, bool], bytes] = {
+    **{(p, True): orjson.dumps(success_response(
+        message=f"{p.value} 整合已生效",
+        data={"logged_in": True}
+    )) for p in SocialPlatform},
+    **{(p, False): orjson.dumps(success_response(
+        message=f"{p.value} 尚未在 .env 中配置憑證",
+        data={"logged_in": False, "configured": False}
+    )) for p in SocialPlatform},
+}
+_LOGOUT_BODIES: Dict[SocialPlatform, bytes] = {
+    p: orjson.dumps(success_response(
+        message=f"已成功移除 {p.value} 的所有設定資訊",
+        data={"logged_in": False}
+    )) for p in SocialPlatform
+}
+
+
+def _json_body(body: bytes) -> Response:
+    """以預先編碼的 JSON 內容建立新的回應物件。"""
+    return Response(body, media_type="application/json")
 
 
 @router.get("/settings")
 async def get_penalty_settings():
     """查詢當前處罰機制的所有設定。"""
-    settings_data = socket_manager.state.penalty_settings.model_dump()
-    return success_response(settings_data)
+    global _settings_dump_cache
+
+    current = socket_manager.state.penalty_settings
+    if _settings_dump_cache is None or _settings_dump_cache[0] is not current:
+        _settings_dump_cache = (current, current.model_dump())
+    return success_response(_settings_dump_cache[1])
 
 
 @router.post("/settings")
-async def update_penalty_settings(request: PenaltySettingsRequest):
-    """批次更新處罰機制設定。"""
-    try:
-        # 將請求轉換為對應的模型實例
-        new_settings = PenaltySettings(
-            enabled_platforms=[SocialPlatform(p) for p in request.enabled_platforms],
-            custom_messages=request.custom_messages,
-            gmail_recipients=request.gmail_recipients or [],
-            include_timestamp=request.include_timestamp,
-            include_violation_count=request.include_violation_count
-        )
+async def update_penalty_settings(new_settings: PenaltySettings):
+    """批次更新處罰機制設定。
+
+    請求本體直接驗證為 PenaltySettings（含平台列舉轉換），不支援的平台會自動回傳 422。
+    """
+    global _settings_dump_cache
 
+    try:
         socket_manager.state.penalty_settings = new_settings
-        await socket_manager.broadcast_state(force=True)
-        return success_response(new_settings.model_dump(), message="設定已成功更新")
-    except ValueError as e:
-        raise HTTPException(
-            status_code=400, detail=f"不支援的平台類型：{str(e)}"
-        ) from e
+        socket_manager.mark_state_changed()
+        _settings_dump_cache = (new_settings, new_settings.model_dump())
+        _broadcast_state_in_background()
+        return success_response(_settings_dump_cache[1], message="設定已成功更新")
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e)) from e
 
@@ -86,104 +247,72 @@ async def update_penalty_settings(request: PenaltySettingsRequest):
 @router.get("/login-status")
 async def get_login_status():
     """獲取目前所有社群平台的連通或登入狀態。"""
-    status = social_manager.get_login_status()
+    global _login_status_cache
+
+    now = time.monotonic()
+    if _login_status_cache is not None and now - _login_status_cache[0] < LOGIN_STATUS_TTL_SEC:
+        return success_response(_login_status_cache[1])
+
+    generation = _login_status_generation
+    status = await social_manager.get_login_status_async()
+    if generation == _login_status_generation:
+        _login_status_cache = (now, status)
     return success_response(status)
 
 
 @router.get("/login-status/{platform}")
 async def get_platform_login_status(platform: str):
     """查詢特定平台的登入（配置）狀態。"""
-    try:
-        plat = SocialPlatform(platform)
-        if plat == SocialPlatform.DISCORD:
-            return success_response({
-                "platform": platform,
-                "logged_in": bool(settings.DISCORD_WEBHOOK_URL)
-            })
-        is_logged_in = social_manager.is_platform_logged_in(plat)
+    plat = _parse_platform(platform)
+    if plat == SocialPlatform.DISCORD:
         return success_response({
             "platform": platform,
-            "logged_in": is_logged_in
+            "logged_in": bool(settings.DISCORD_WEBHOOK_URL)
         })
-    except ValueError as exc:
-        raise HTTPException(status_code=400, detail=f"未知平台：{platform}") from exc
+    is_logged_in = social_manager.is_platform_logged_in(plat)
+    return success_response({
+        "platform": platform,
+        "logged_in": is_logged_in
+    })
 
 
 @router.post("/login/{platform}")
 async def open_login(platform: str):
     """引導進行手動登入程序。"""
-    try:
-        plat = SocialPlatform(platform)
-        if plat == SocialPlatform.DISCORD:
-            return success_response(
-                message=f"{platform} 採 Webhook URL 配置。請直接在下方輸入網址。"
-            )
-        return success_response(
-            message=f"{platform} 目前僅支援直接憑證設定。請於 .env 檔案中進行配置。",
-            data={"configured": False}
-        )
-    except ValueError as exc:
-        raise HTTPException(status_code=400, detail=f"未知平台：{platform}") from exc
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"無法啟動登入流程：{str(e)}") from e
+    plat = _parse_platform(platform)
+    return _json_body(_OPEN_LOGIN_BODIES[plat])
 
 
 @router.post("/save-session/{platform}")
 async def save_platform_session(platform: str):
     """保存瀏覽器自動化作業中的 Session (用於持久化登入)。"""
-    try:
-        plat = SocialPlatform(platform)
-        if social_manager.is_platform_logged_in(plat):
-            return success_response(
-                message=f"{platform} 整合已生效",
-                data={"logged_in": True}
-            )
-        return success_response(
-            message=f"{platform} 尚未在 .env 中配置憑證",
-            data={"logged_in": False, "configured": False}
-        )
-    except ValueError as exc:
-        raise HTTPException(
-            status_code=400, detail=f"未知平台：{platform}"
-        ) from exc
+    plat = _parse_platform(platform)
+    logged_in = bool(social_manager.is_platform_logged_in(plat))
+    return _json_body(_SAVE_SESSION_BODIES[plat, logged_in])
 
 
 @router.post("/logout/{platform}")
 async def logout_platform(platform: str):
     """登出特定平台並清除所有儲存的憑證檔案。"""
-    try:
-        plat = SocialPlatform(platform)
-
-        # 根據平台類型進行資源清理
-        if plat == SocialPlatform.GMAIL:
-            credential_store.clear_gmail()
-            settings.GMAIL_USER = None
-            settings.GMAIL_APP_PASSWORD = None
-        elif plat == SocialPlatform.THREADS:
-            credential_store.clear_threads()
-            settings.THREADS_USER_ID = None
-            settings.THREADS_ACCESS_TOKEN = None
-        elif plat == SocialPlatform.DISCORD:
-            credential_store.clear_discord()
-            settings.DISCORD_WEBHOOK_URL = None
-
-        return success_response(
-            message=f"已成功移除 {platform} 的所有設定資訊",
-            data={"logged_in": False}
-        )
-    except ValueError as exc:
-        raise HTTPException(status_code=400, detail=f"未知平台：{platform}") from exc
+    plat = _parse_platform(platform)
+
+    # 根據平台類型進行資源清理
+    handler = _LOGOUT_HANDLERS.get(plat)
+    if handler:
+        await handler()
+        _invalidate_login_status()
+
+    return _json_body(_LOGOUT_BODIES[plat])
 
 
 @router.post("/test-post")
 async def test_post(request: TestPostRequest):
     """執行測試性質的公開發文。"""
+    platform = _parse_platform(request.platform)
     try:
-        platform = SocialPlatform(request.platform)
         success = False
 
         # 若存在人質照片，Threads 發文時會優先使用
-        from .sessions import get_hostage_image_if_exists
         hostage_path = get_hostage_image_if_exists()
 
         if platform == SocialPlatform.DISCORD:
@@ -201,99 +330,25 @@ async def test_post(request: TestPostRequest):
                 data={"platform": request.platform, "hostage_used": hostage_path}
             )
         raise HTTPException(status_code=500, detail=f"無法在 {request.platform} 正常發佈訊息")
-    except Exception as e:
-        import traceback
-        traceback.print_exc()
-        raise HTTPException(status_code=500, detail=str(e)) from e
-
-
-# ========== 憑證管理 API (主要供管理介面使用) ==========
-
-@router.post("/credentials/gmail")
-async def set_gmail_credentials(request: GmailCredentialsRequest):
-    """設定 Gmail 發信專用憑證。"""
-    try:
-        # 驗證 Gmail 帳號格式
-        import re
-        email_pattern = r'^[a-zA-Z0-9._%+-]+@(gmail\.com)$'
-        if not re.match(email_pattern, request.email.lower()):
-            raise HTTPException(
-                status_code=400,
-                detail="請輸入有效的 Gmail 地址（需以 @gmail.com 結尾）"
-            )
-        
-        # 驗證應用程式密碼格式（應為 16 位無空格字元）
-        app_password_clean = request.app_password.replace(" ", "").strip()
-        if len(app_password_clean) != 16 or not app_password_clean.isalpha():
-            raise HTTPException(
-                status_code=400,
-                detail="應用程式密碼格式錯誤：應為 16 位英文字母（不含空格）"
-            )
-        
-        # 持久化儲存
-        credential_store.update_gmail(request.email, app_password_clean)
-
-        # 同步更新執行期環境變數
-        settings.GMAIL_USER = request.email
-        settings.GMAIL_APP_PASSWORD = app_password_clean
-
-        return success_response(message="Gmail 發信資訊已就位", data={"logged_in": True})
     except HTTPException:
         raise
     except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Gmail 憑證更新失敗：{str(e)}") from e
-
-
-@router.post("/credentials/threads")
-async def set_threads_credentials(request: ThreadsCredentialsRequest):
-    """設定 Threads API 密鑰資訊。"""
-    try:
-        # 驗證 User ID 格式（應為純數字）
-        if not request.user_id.strip().isdigit():
-            raise HTTPException(
-                status_code=400,
-                detail="Threads User ID 格式錯誤：應為純數字"
-            )
-        
-        # 驗證 Access Token 格式（基本長度檢查）
-        access_token_clean = request.access_token.strip()
-        if len(access_token_clean) < 20:
-            raise HTTPException(
-                status_code=400,
-                detail="Threads Access Token 格式錯誤：密鑰長度不足"
-            )
-        
-        credential_store.update_threads(request.user_id.strip(), access_token_clean)
-
-        settings.THREADS_USER_ID = request.user_id.strip()
-        settings.THREADS_ACCESS_TOKEN = access_token_clean
+        logger.exception("[社交平台] 測試發文至 %s 失敗", request.platform)
+        raise HTTPException(status_code=500, detail=str(e)) from e
 
-        return success_response(message="Threads API 密鑰已儲存", data={"logged_in": True})
-    except HTTPException:
-        raise
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Threads 憑證儲存失敗：{str(e)}") from e
 
+# ========== 憑證管理 API (主要供管理介面使用) ==========
 
 @router.post("/credentials/threads/browser")
 async def login_threads_browser(request: ThreadsBrowserLoginRequest):
-    """透過自動化瀏覽器直接登入 Threads 帳號。"""
+    """透過自動化瀏覽器直接登入 Threads 帳號（帳號密碼已由請求模型去除空白並檢查非空）。"""
     try:
-        # 驗證帳號和密碼不為空
-        if not request.username.strip() or not request.password.strip():
-            raise HTTPException(
-                status_code=400,
-                detail="帳號和密碼不可為空"
-            )
-        
-        success = await social_manager.login_threads_browser(
-            request.username.strip(),
-            request.password.strip()
-        )
+        success = await social_manager.login_threads_browser(request.username, request.password)
 
         if success:
             # 登入成功後即刻廣播狀態變更
-            await socket_manager.broadcast_state(force=True)
+            _invalidate_login_status()
+            _broadcast_state_in_background()
             return success_response(message="Threads 登入成功！", data={"logged_in": True})
         raise HTTPException(
             status_code=400,
@@ -305,48 +360,97 @@ async def login_threads_browser(request: ThreadsBrowserLoginRequest):
         raise HTTPException(status_code=500, detail=f"自動化登入程序發生異常：{str(e)}") from e
 
 
-@router.post("/credentials/discord")
-async def set_discord_credentials(request: DiscordCredentialsRequest):
-    """設定 Discord 處罰通知專用的 Webhook 網址。"""
+async def _save_gmail(request: GmailCredentialsRequest) -> None:
+    """儲存 Gmail 發信專用憑證並同步執行期設定。"""
+    await asyncio.to_thread(credential_store.update_gmail, request.email, request.app_password)
+    settings.GMAIL_USER = request.email
+    settings.GMAIL_APP_PASSWORD = request.app_password
+
+
+async def _save_threads(request: ThreadsCredentialsRequest) -> None:
+    """儲存 Threads API 密鑰並同步執行期設定。"""
+    await asyncio.to_thread(credential_store.update_threads, request.user_id, request.access_token)
+    settings.THREADS_USER_ID = request.user_id
+    settings.THREADS_ACCESS_TOKEN = request.access_token
+
+
+async def _save_discord(request: DiscordCredentialsRequest) -> None:
+    """儲存 Discord Webhook 網址並同步執行期設定。"""
+    await asyncio.to_thread(credential_store.update_discord, request.webhook_url)
+    settings.DISCORD_WEBHOOK_URL = request.webhook_url
+
+
+def _credentials_saved_body(message: str) -> bytes:
+    """預先編碼憑證設定成功時的固定回應內容。"""
+    return orjson.dumps(success_response(message=message, data={"logged_in": True}))
+
+
+# 各平台的憑證設定方式：(請求模型, 儲存函式, 預先編碼的成功回應, 失敗訊息前綴)
+_CREDENTIAL_HANDLERS: Dict[
+    SocialPlatform, tuple[type[BaseModel], Callable[[Any], Awaitable[None]], bytes, str]
+] = {
+    SocialPlatform.GMAIL: (
+        GmailCredentialsRequest, _save_gmail,
+        _credentials_saved_body("Gmail 發信資訊已就位"), "Gmail 憑證更新失敗"
+    ),
+    SocialPlatform.THREADS: (
+        ThreadsCredentialsRequest, _save_threads,
+        _credentials_saved_body("Threads API 密鑰已儲存"), "Threads 憑證儲存失敗"
+    ),
+    SocialPlatform.DISCORD: (
+        DiscordCredentialsRequest, _save_discord,
+        _credentials_saved_body("Discord 轉發位址已更新"), "Discord webhook 更新失敗"
+    ),
+}
+
+
+@router.post("/credentials/{platform}")
+async def set_credentials(platform: str, body: Dict[str, Any] = Body(...)):
+    """設定指定平台的憑證（Gmail 應用程式密碼、Threads API 密鑰或 Discord Webhook）。
+
+    請求本體依平台交由對應的請求模型驗證，格式錯誤時回傳 422。
+    """
+    model, save, success_body, error_prefix = _CREDENTIAL_HANDLERS[_parse_platform(platform)]
     try:
-        # 驗證 Discord Webhook URL 格式
-        import re
-        webhook_pattern = r'^https://discord\.com/api/webhooks/\d+/[A-Za-z0-9_-]+$'
-        webhook_url_clean = request.webhook_url.strip()
-        
-        if not re.match(webhook_pattern, webhook_url_clean):
-            raise HTTPException(
-                status_code=400,
-                detail="Discord Webhook URL 格式錯誤：應為 https://discord.com/api/webhooks/... 格式"
-            )
-        
-        credential_store.update_discord(webhook_url_clean)
-        settings.DISCORD_WEBHOOK_URL = webhook_url_clean
+        request = model.model_validate(body)
+    except ValidationError as e:
+        # 與 FastAPI 自動驗證的錯誤格式一致，位置前綴為 body
+        raise RequestValidationError(
+            [{**err, "loc": ("body", *err["loc"])} for err in e.errors(include_url=False)]
+        ) from e
 
-        return success_response(message="Discord 轉發位址已更新", data={"logged_in": True})
-    except HTTPException:
-        raise
+    try:
+        await save(request)
+        _invalidate_login_status()
+        return _json_body(success_body)
     except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Discord webhook 更新失敗：{str(e)}") from e
+        raise HTTPException(status_code=500, detail=f"{error_prefix}：{str(e)}") from e
+
+
+def _credential_summary(plat: SocialPlatform, is_configured: bool) -> dict:
+    """組出單一平台的設定概況，僅含非敏感欄位，避免外洩實際 Token。"""
+    info = {"configured": is_configured}
+
+    if is_configured:
+        get_info = _CREDENTIAL_INFO.get(plat)
+        if get_info:
+            info.update(get_info())
+
+    return info
+
+
+@router.get("/credentials")
+async def get_all_credentials_status():
+    """一次查詢所有平台的設定概況（遮蔽敏感內文），省去逐平台請求的往返。"""
+    status = await social_manager.get_login_status_async()
+    return success_response({
+        plat.value: _credential_summary(plat, status[plat.value])
+        for plat in SocialPlatform
+    })
 
 
 @router.get("/credentials/{platform}")
 async def get_credentials_status(platform: str):
     """查詢各平台的設定概況（遮蔽敏感內文）。"""
-    try:
-        plat = SocialPlatform(platform)
-        is_configured = social_manager.is_platform_logged_in(plat)
-
-        # 僅返回安全性摘要摘要，避免外洩實際 Token
-        info = {"configured": is_configured}
-
-        if plat == SocialPlatform.GMAIL and is_configured:
-            info["email"] = settings.GMAIL_USER
-        elif plat == SocialPlatform.THREADS and is_configured:
-            info["user_id"] = settings.THREADS_USER_ID
-        elif plat == SocialPlatform.DISCORD and is_configured:
-            info["webhook_configured"] = True
-
-        return info
-    except ValueError as exc:
-        raise HTTPException(status_code=400, detail=f"未知平台：{platform}") from exc
+    plat = _parse_platform(platform)
+    return _credential_summary(plat, social_manager.is_platform_logged_in(plat))
@@ -118,12 +118,14 @@ def success_response(data: Any = None, message: str = None) -> Dict[str, Any]:
         data: 回傳的數據物件
         message: 選填的成功文字說明
     """
-    response = {"success": True}
-    if data is not None:
-        response["data"] = data
+    # 依欄位組合直接以字典字面值建立，省去逐一插入鍵值的成本
+    if data is None:
+        if message:
+            return {"success": True, "message": message}
+        return {"success": True}
     if message:
-        response["message"] = message
-    return response
+        return {"success": True, "data": data, "message": message}
+    return {"success": True, "data": data}
 
 
 def error_response(
@@ -2,12 +2,14 @@
 專注任務儲存模組
 ====================
 負責持久化儲存專注任務的歷史紀錄，確保數據在伺服器重啟後依然存在。
-使用 JSON 檔案作為輕量級的資料庫。
+使用 JSON Lines 檔案（每行一筆紀錄）作為輕量級的資料庫，新增紀錄時僅需附加一行。
 """
 
-import json
+import os
+from operator import attrgetter
 from pathlib import Path
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Union
+import orjson
 from pydantic import BaseModel
 
 
@@ -23,54 +25,185 @@ class SessionRecord(BaseModel):
     total_focus_time_seconds: int = 0
 
 
+# 歷史紀錄的排序鍵（啟動時間，ISO 8601 字串可直接依字典序比較）
+_START_TIME = attrgetter('start_time')
+
+
+def _insert_by_start_time(records: List[SessionRecord], record: SessionRecord) -> None:
+    """將紀錄加入依啟動時間遞增排列的清單。
+
+    新紀錄通常比既有紀錄晚開始，直接附加即可；少數亂序時才重新排序
+    （清單幾乎已排序，Timsort 僅需線性時間）。
+    """
+    records.append(record)
+    if len(records) > 1 and records[-2].start_time > record.start_time:
+        records.sort(key=_START_TIME)
+
+
 class SessionStore:
     """歷史紀錄管理類別。
 
     封裝了對 JSON 檔案的所有讀寫操作，並提供統計與分頁功能。
     """
 
-    def __init__(self, data_dir: Optional[Path] = None):
+    def __init__(self, data_dir: Optional[Path] = None, trust_disk: bool = False):
         """初始化存儲空間。
 
         參數：
             data_dir: 數據存放目錄。預設為 backend/data/
+            trust_disk: 是否信任磁碟上的紀錄內容。啟用時以 model_construct 略過欄位驗證，
+                可加快大量紀錄的啟動載入，但格式錯誤的紀錄將無法被偵測
         """
         if data_dir is None:
             data_dir = Path(__file__).parent.parent / "data"
 
         self.data_dir = data_dir
         self.data_dir.mkdir(parents=True, exist_ok=True)
+        self.trust_disk = trust_disk
 
-        self.history_file = self.data_dir / "session_history.json"
+        self.history_file = self.data_dir / "session_history.jsonl"
+        # 舊版以單一 JSON 陣列儲存，僅於首次載入時轉換為 JSON Lines
+        self.legacy_history_file = self.data_dir / "session_history.json"
         self.state_file = self.data_dir / "last_session_state.json"
 
+        # 全部紀錄，載入後依啟動時間遞增排列，直接作為分頁索引使用
         self._history: List[SessionRecord] = []
+        # 統計數據的累計值，載入時計算一次，之後於新增紀錄時增量更新
+        # （總數與各狀態筆數直接取自 _history 與 _by_status 的長度，不另行計數）
+        self._stats: Dict[str, int] = {}
+        # 依狀態分組的紀錄（同樣依啟動時間遞增排列）
+        self._by_status: Dict[str, List[SessionRecord]] = {}
         self._load_history()
+        self._rebuild_stats()
+        self._rebuild_index()
 
     def _load_history(self) -> None:
         """從磁碟載入所有歷史紀錄。"""
-        if self.history_file.exists():
+        if not self.history_file.exists():
+            if self.legacy_history_file.exists():
+                self._migrate_legacy_history()
+            return
+
+        if self.trust_disk:
+            construct = SessionRecord.model_construct
+
+            def parse(line: bytes) -> SessionRecord:
+                return construct(**orjson.loads(line))
+        else:
+            # 直接由 pydantic-core 解析原始 JSON 位元組，省去中間字典與關鍵字參數展開
+            parse = SessionRecord.model_validate_json
+
+        # 一次讀入整份檔案再於記憶體中切行，省去逐行 readline 的呼叫成本
+        try:
+            lines = self.history_file.read_bytes().splitlines()
+        except OSError as e:
+            print(f"[SessionStore] 歷史紀錄載入失敗：{e}")
+            return
+
+        corrupted = False
+        records = self._history
+        for line_no, line in enumerate(lines, 1):
+            if not line.strip():
+                continue
             try:
-                with open(self.history_file, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                    self._history = [SessionRecord(**record) for record in data]
-            except (json.JSONDecodeError, Exception) as e:
-                print(f"[SessionStore] 歷史紀錄載入失敗：{e}")
-                self._history = []
+                records.append(parse(line))
+            except (ValueError, TypeError) as e:
+                # 單行損毀（例如寫入途中斷電）僅略過該筆，不影響其餘紀錄
+                # （ValidationError 與 orjson.JSONDecodeError 皆為 ValueError 的子類別）
+                print(f"[SessionStore] 略過第 {line_no} 行無法解析的紀錄：{e}")
+                corrupted = True
+
+        # 重寫檔案以移除損毀的行，避免後續附加的紀錄接在不完整的行尾
+        if corrupted:
+            self._save_history()
+
+    def _migrate_legacy_history(self) -> None:
+        """讀取舊版 JSON 陣列格式的歷史紀錄，並改寫為 JSON Lines 格式（舊檔保留不刪除）。"""
+        try:
+            data = orjson.loads(self.legacy_history_file.read_bytes())
+            validate = SessionRecord.model_validate
+            self._history = [validate(record) for record in data]
+        except (OSError, ValueError, TypeError) as e:
+            print(f"[SessionStore] 歷史紀錄載入失敗：{e}")
+            self._history = []
+            return
+        self._save_history()
 
     def _save_history(self) -> None:
-        """將目前所有紀錄寫回磁碟。"""
+        """將目前所有紀錄整份寫回磁碟（僅用於格式轉換或重寫，新增紀錄請用 add_session）。
+
+        先於記憶體中編碼完成再一次寫入暫存檔，最後以 os.replace 原子性地取代原檔。
+        """
+        buf = b"".join(
+            orjson.dumps(record.model_dump(), option=orjson.OPT_APPEND_NEWLINE)
+            for record in self._history
+        )
+        self._write_atomic(self.history_file, buf)
+
+    @staticmethod
+    def _write_atomic(path: Path, data: bytes) -> None:
+        """以「寫入暫存檔後取代」的方式寫檔，避免中途失敗留下不完整的檔案。"""
+        tmp_path = path.with_suffix(path.suffix + ".tmp")
         try:
-            with open(self.history_file, 'w', encoding='utf-8') as f:
-                data = [record.model_dump() for record in self._history]
-                json.dump(data, f, ensure_ascii=False, indent=2)
+            tmp_path.write_bytes(data)
+            os.replace(tmp_path, path)
         except Exception as e:
+            tmp_path.unlink(missing_ok=True)
             print(f"[SessionStore] 磁碟寫入失敗：{e}")
 
-    def add_session(self, record: SessionRecord) -> None:
-        """新增一筆已結束的任務紀錄。"""
-        self._history.append(record)
-        self._save_history()
+    def _rebuild_stats(self) -> None:
+        """以單次走訪重新計算所有紀錄的時間累計值。
+
+        以區域變數計數，避免對每筆紀錄呼叫 _accumulate_stats 與反覆存取字典。
+        """
+        focus_seconds = duration_minutes = 0
+        for record in self._history:
+            focus_seconds += record.total_focus_time_seconds
+            duration_minutes += record.duration_minutes
+
+        self._stats = {
+            "focus_seconds": focus_seconds,
+            "duration_minutes": duration_minutes,
+        }
+
+    def _accumulate_stats(self, record: SessionRecord) -> None:
+        """將單筆紀錄計入時間累計值。"""
+        stats = self._stats
+        stats["focus_seconds"] += record.total_focus_time_seconds
+        stats["duration_minutes"] += record.duration_minutes
+
+    def _rebuild_index(self) -> None:
+        """依啟動時間排序全部紀錄並重建狀態分組。"""
+        self._history.sort(key=_START_TIME)
+        by_status: Dict[str, List[SessionRecord]] = {}
+        for record in self._history:
+            group = by_status.get(record.status)
+            if group is None:
+                by_status[record.status] = [record]
+            else:
+                group.append(record)
+        self._by_status = by_status
+
+    def add_session(self, record: Union[SessionRecord, Dict[str, Any]]) -> None:
+        """新增一筆已結束的任務紀錄，僅將該筆附加至檔案末端。
+
+        亦可直接傳入欄位齊全且型別正確的字典：該字典原樣寫入檔案，
+        記憶體中的紀錄以 model_construct 建立，不經過驗證與 model_dump。
+        """
+        if isinstance(record, dict):
+            line = orjson.dumps(record, option=orjson.OPT_APPEND_NEWLINE)
+            record = SessionRecord.model_construct(**record)
+        else:
+            line = orjson.dumps(record.model_dump(), option=orjson.OPT_APPEND_NEWLINE)
+
+        _insert_by_start_time(self._history, record)
+        self._accumulate_stats(record)
+        _insert_by_start_time(self._by_status.setdefault(record.status, []), record)
+        try:
+            with open(self.history_file, 'ab') as f:
+                f.write(line)
+        except Exception as e:
+            print(f"[SessionStore] 磁碟寫入失敗：{e}")
 
     def get_history(
         self,
@@ -88,23 +221,28 @@ class SessionStore:
         返回：
             排序後的紀錄清單（最新任務排在最前面）
         """
-        filtered = self._history
-
         if status_filter:
-            filtered = [r for r in filtered if r.status == status_filter]
+            records = self._by_status.get(status_filter, [])
+        else:
+            records = self._history
 
-        # 依據啟動時間進行降冪排序 (Newest first)
-        sorted_history = sorted(
-            filtered,
-            key=lambda x: x.start_time,
-            reverse=True
-        )
+        # 索引依啟動時間遞增排列，由尾端往前切出目標頁面後反轉 (Newest first)
+        end = len(records) - offset
+        if end <= 0:
+            return []
+        return records[max(end - limit, 0):end][::-1]
 
-        return sorted_history[offset:offset + limit]
+    def count(self, status_filter: Optional[str] = None) -> int:
+        """回傳紀錄總數（或指定狀態的紀錄數），直接取自索引長度。"""
+        if status_filter:
+            return len(self._by_status.get(status_filter, ()))
+        return len(self._history)
 
     def get_statistics(self) -> Dict[str, Any]:
-        """彙整歷史數據統計資訊。"""
-        if not self._history:
+        """彙整歷史數據統計資訊（直接由累計值與狀態分組計算，不需走訪所有紀錄）。"""
+        stats = self._stats
+        total = len(self._history)
+        if not total:
             return {
                 "total_sessions": 0,
                 "completed_sessions": 0,
@@ -114,37 +252,31 @@ class SessionStore:
                 "average_session_minutes": 0.0
             }
 
-        total = len(self._history)
-        completed = sum(1 for r in self._history if r.status == "COMPLETED")
-        violated = sum(1 for r in self._history if r.status == "VIOLATED")
-        total_focus_seconds = sum(r.total_focus_time_seconds for r in self._history)
-
+        completed = self.count("COMPLETED")
         return {
             "total_sessions": total,
             "completed_sessions": completed,
-            "violated_sessions": violated,
-            "completion_rate": round(completed / total * 100, 1) if total > 0 else 0.0,
-            "total_focus_time_hours": round(total_focus_seconds / 3600, 2),
-            "average_session_minutes": round(
-                sum(r.duration_minutes for r in self._history) / total, 1
-            ) if total > 0 else 0.0
+            "violated_sessions": self.count("VIOLATED"),
+            "completion_rate": round(completed / total * 100, 1),
+            "total_focus_time_hours": round(stats["focus_seconds"] / 3600, 2),
+            "average_session_minutes": round(stats["duration_minutes"] / total, 1)
         }
 
     def save_session_state(self, state: Dict[str, Any]) -> None:
         """發生意外中斷前，保存當前執行中的任務狀態以便後續恢復。"""
         try:
-            with open(self.state_file, 'w', encoding='utf-8') as f:
-                json.dump(state, f, ensure_ascii=False, indent=2, default=str)
+            data = orjson.dumps(state, default=str, option=orjson.OPT_NON_STR_KEYS)
         except Exception as e:
             print(f"[SessionStore] 狀態存儲失敗：{e}")
+            return
+        self._write_atomic(self.state_file, data)
 
     def load_session_state(self) -> Optional[Dict[str, Any]]:
         """載入上次保存的任務狀態（用於伺服器重啟後的恢復流程）。"""
         if self.state_file.exists():
             try:
-                with open(self.state_file, 'r', encoding='utf-8') as f:
-                    return json.load(f)
-            except (json.JSONDecodeError, Exception) as e:
+                return orjson.loads(self.state_file.read_bytes())
+            except Exception as e:
                 print(f"[SessionStore] 狀態載入失敗：{e}")
         return None
 
@@ -8,23 +8,71 @@ Socket 管理模組
 - mock_hardware.py: 虛擬硬體模擬邏輯
 """
 
-from datetime import datetime
-from typing import Optional, Callable, List, Dict, Any
+import asyncio
+import time
+from datetime import datetime, timedelta
+from typing import Optional, Callable, Dict, Any, List, Set, Tuple
+import orjson
 import socketio
 
-from .logger import safe_print
+try:
+    import msgpack
+except ImportError:  # 選用相依套件：未安裝時僅提供 JSON 格式的 system_state
+    msgpack = None
+
+from .logger import logger
 from .models import (
     SystemState, BoxStatus, SessionStatus, PenaltySettings, PenaltyConfig,
-    HardwareState, NoiseStatus
+    HardwareState, NoiseStatus, PhoneStatus
 )
 from .state_manager import StateManager
 from .violation_checker import ViolationChecker
 from .mock_hardware import MockHardwareState, MockHardwareController
 from .progressive_penalty import ProgressivePenaltyManager, PenaltyLevel
-from .session_store import session_store, SessionRecord
+from .session_store import session_store
 from .daily_violation_store import daily_violation_store
 
 
+# 內容建立後不再修改的狀態推送事件，同一份內容的編碼結果可在各客戶端之間共用
+_IMMUTABLE_PAYLOAD_EVENTS = frozenset({'system_state', 'state_patch'})
+
+
+class _OrjsonCodec:
+    """供 Socket.IO 封包編解碼使用的 orjson 轉接層（介面相容標準 json 模組）。
+
+    狀態推送依客戶端逐一送出，同一份內容會被編碼多次；因此保留最近一次狀態事件的
+    編碼結果，內容物件相同時直接沿用，每次推送只需編碼一次。
+    """
+
+    # (事件名稱, 內容物件, 編碼結果)；保留內容物件的參考以確保身分比對有效
+    _last_state_packet: Tuple[Optional[str], Any, str] = (None, None, '')
+
+    @classmethod
+    def dumps(cls, obj: Any, **kwargs) -> str:
+        # orjson 預設即為緊湊格式，忽略 separators 等標準 json 參數
+        if (type(obj) is list and len(obj) == 2 and type(obj[0]) is str
+                and obj[0] in _IMMUTABLE_PAYLOAD_EVENTS):
+            event, payload = obj
+            last_event, last_payload, encoded = cls._last_state_packet
+            if payload is last_payload and event == last_event:
+                return encoded
+            encoded = orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS).decode()
+            cls._last_state_packet = (event, payload, encoded)
+            return encoded
+        return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS).decode()
+
+    @staticmethod
+    def loads(data: Any, **kwargs) -> Any:
+        return orjson.loads(data)
+
+
+# 尚未輸出過的日誌 key 所對應的上次輸出時間
+_NEVER_LOGGED = float('-inf')
+
+# 違規檢查函式：回傳 None 表示不適用，否則回傳 (是否違規, 違規原因)
+PenaltyCheck = Callable[[SystemState, datetime], Optional[Tuple[bool, str]]]
+
+
 class SocketManager:
     """核心 Socket.IO 管理器，負責協調所有子系統。
 
@@ -34,23 +82,35 @@ class SocketManager:
     - 將業務邏輯分發至對應的專業模組
     """
 
+    # 廣播對象超過此數量時分批送出，批次之間讓出事件迴圈
+    BROADCAST_BATCH_SIZE = 50
+
+    # 事件合併視窗：視窗內的多個事件合併為單一 batch 訊框送出；累積達上限時立即送出
+    EVENT_COALESCE_SEC = 0.02
+    EVENT_COALESCE_MAX = 140
+
+    # 內容未變時略過廣播的高頻事件
+    DEDUP_EVENTS = frozenset({'hardware_status'})
+
     def __init__(self) -> None:
         # 初始化 Socket.IO 異步伺服器
         self.sio = socketio.AsyncServer(
             async_mode='asgi',
             cors_allowed_origins='*',
             logger=False,
-            engineio_logger=False
+            engineio_logger=False,
+            # 以 orjson 編碼封包，每次廣播僅需一次快速的 JSON 編碼
+            json=_OrjsonCodec
         )
         self.app = socketio.ASGIApp(self.sio)
 
-        print("[Socket.IO] 伺服器已初始化")
+        logger.info("[Socket.IO] 伺服器已初始化")
 
-        # 追蹤當前連線的前端客戶端 SID
-        self.connected_clients: List[str] = []
+        # 追蹤當前連線的前端客戶端 SID（以集合儲存，加入與移除皆為 O(1)）
+        self.connected_clients: Set[str] = set()
 
-        # 用於限制日誌輸出的頻率，避免過多重複資訊
-        self.last_log_time: Dict[str, datetime] = {}
+        # 用於限制日誌輸出的頻率，避免過多重複資訊（以 time.monotonic() 秒數記錄）
+        self.last_log_time: Dict[str, float] = {}
         self.log_throttle_seconds: float = 5.0
 
         # 初始化各個功能子系統
@@ -81,6 +141,40 @@ class SocketManager:
         # 追蹤當前違規狀態是否已經被記錄，防止重複計數
         self._current_violation_recorded = False
 
+        # 依任務懲罰配置預先建立的違規檢查清單，配置物件更換時才重建
+        self._penalty_checks: List[PenaltyCheck] = []
+        self._penalty_checks_config: Optional[PenaltyConfig] = None
+
+        # 供 REST 查詢使用的公開狀態快照，狀態異動時失效並於下次查詢時重建
+        self._public_snapshot: Optional[Dict[str, Any]] = None
+
+        # 節流期間被略過的廣播改為於間隔結束時補發一次，確保前端最終收到最新狀態
+        self._pending_broadcast: Optional[asyncio.Task] = None
+
+        # 每個客戶端各自的狀態發送佇列（容量 1，項目為 (事件名稱, 內容)）與發送任務，
+        # 較慢的客戶端的待送項目會被合併，不會累積過時的狀態
+        self._state_queues: Dict[str, asyncio.Queue] = {}
+        self._state_senders: Dict[str, asyncio.Task] = {}
+
+        # 上一次推送的狀態內容，作為計算 state_patch 差異的基準（新連線會先收到完整狀態）
+        self._last_published_state: Optional[Dict[str, Any]] = None
+
+        # 選擇以 MessagePack 二進位格式接收狀態（system_state_bin）的客戶端，
+        # 每次推送只打包一次，其餘客戶端維持原本的 JSON system_state
+        self._binary_state_clients: Set[str] = set()
+
+        # 等待合併送出的事件 (事件名稱, 資料) 與負責送出的延遲任務
+        self._pending_events: List[Tuple[str, Dict[str, Any]]] = []
+        # 高頻事件上次廣播的內容，內容相同時不再重複廣播（新連線會直接收到完整資訊）
+        self._last_event_payloads: Dict[str, Dict[str, Any]] = {}
+        self._event_flush_task: Optional[asyncio.Task] = None
+        # 背景事件送出任務的強參照，避免任務在完成前被垃圾回收
+        self._background_tasks: Set[asyncio.Task] = set()
+
+        # hardware_status 的固定欄位範本，以其來源值組成的鍵判斷是否需要重建
+        # （連線風暴時每次連線只需複製範本並填入模擬狀態）
+        self._hw_status_template: Optional[Tuple[tuple, Dict[str, Any]]] = None
+
         # 註冊所有的 Socket 事件處理器
         self._setup_handlers()
 
@@ -102,6 +196,7 @@ class SocketManager:
     def hardware_connected(self, value: bool) -> None:
         # 手動更新硬體連線狀態
         self._state_manager.hardware_connected = value
+        self._public_snapshot = None
 
     @property
     def mock_mode_active(self) -> bool:
@@ -132,6 +227,7 @@ class SocketManager:
     def physical_hardware_ws_connected(self, value: bool) -> None:
         # 更新實體硬體 WebSocket 連線狀態
         self._state_manager.physical_hardware_ws_connected = value
+        self._public_snapshot = None
 
     @property
     def progressive_penalty_state(self) -> dict:
@@ -159,8 +255,8 @@ class SocketManager:
             # 廣播懲罰事件給前端，讓前端播放動畫
             # 注意：實際的懲罰訊息發送由前端動畫完成後透過 /api/penalty/execute 觸發
             # 移除此處對 penalty_callbacks 的直接呼叫，避免雙重發送
-            safe_print(f"[懲罰] 🚨 違規懲罰 - {reason}")
-            safe_print("[懲罰協定] 通知前端播放動畫，等待 API 呼叫執行實際發送...")
+            logger.info("[懲罰] 🚨 違規懲罰 - %s", reason)
+            logger.info("[懲罰協定] 通知前端播放動畫，等待 API 呼叫執行實際發送...")
 
             await self.broadcast_event('penalty_level', {
                 'level': 'PENALTY',
@@ -185,205 +281,214 @@ class SocketManager:
     # =========================================================================
 
     def _setup_handlers(self) -> None:
-        # 定義 Socket.IO 各項事件的監聽邏輯
-
-        @self.sio.event
-        async def connect(sid, environ):
-            # 前端客戶端連線成功後，立即推送當前系統與硬體狀態
-            self.connected_clients.append(sid)
-            self._throttled_log('client_connect', f"[WS] 客戶端已連線: {sid}", force=True)
-            await self.sio.emit('system_state', self._serialize_state(), room=sid)
-            await self.sio.emit('hardware_status', self._build_hardware_status(), room=sid)
-
-        @self.sio.event
-        async def disconnect(sid):
-            # 客戶端斷開連線，清理追蹤清單
-            if sid in self.connected_clients:
-                self.connected_clients.remove(sid)
-            self._throttled_log('client_disconnect', f"[WS] 客戶端已斷開: {sid}", force=True)
-
-        @self.sio.event
-        async def hardware_connect(sid, data):
-            # 處理實體硬體 (D1-mini) 發出的連線正式註冊事件
-            if self.mock_mode_active:
-                self._throttled_log('hw_ignored', "[硬體] 當前為模擬模式，忽略實體硬體連線請求", force=False)
-                return
-
-            hardware_id = data.get('hardware_id', 'UNKNOWN')
-            version = data.get('version', 'N/A')
-            board = data.get('board', 'D1-mini')
-            features = data.get('features', '')
-
-            # 根據硬體傳來的特徵字串判斷感測器配置
-            hall_detected = 'hall' in features or data.get('hall_detected', True)
-            radar_detected = 'radar' in features or data.get('radar_detected', True)
-            lcd_detected = 'lcd' in features
-            nfc_detected = data.get('nfc_detected', False)
-
-            self._throttled_log('hw_connect', f"[硬體] 已上線 - ID: {hardware_id}, 版本: {version}, 開發板: {board}", force=True)
-
-            self._state_manager.update_hardware_info(
-                hardware_id=hardware_id,
-                version=version,
-                features=features,
-                nfc_detected=nfc_detected,
-                ldr_detected=hall_detected,
-                radar_detected=radar_detected
-            )
-
-            await self.broadcast_event('hardware_status', self._build_hardware_status(
-                hardware_id=hardware_id,
-                version=version,
-                board=board,
-                features=features,
-                lcd_detected=lcd_detected
-            ))
+        # 以綁定方法註冊 Socket.IO 各項事件的監聽邏輯
+        for event in (
+            'connect',
+            'disconnect',
+            'hardware_connect',
+            'heartbeat',
+            'state_change',
+            'sensor_data',
+            'start_session',
+            'stop_session',
+            'update_penalty_settings',
+            'update_penalty_config',
+            'toggle_mock_hardware',
+            'subscribe_binary_state',
+        ):
+            self.sio.on(event, getattr(self, f'_on_{event}'))
+
+    async def _on_connect(self, sid, environ):
+        # 前端客戶端連線成功後，立即推送當前系統與硬體狀態
+        self.connected_clients.add(sid)
+        self._throttled_log('client_connect', f"[WS] 客戶端已連線: {sid}", force=True)
+        # 先將尚未推送的變動送給既有客戶端，再以完整狀態作為新客戶端佇列的第一筆，
+        # 之後的 state_patch 皆以此為基準，尚未送出前也會合併進這筆完整狀態
+        self._publish_state()
+        self._open_state_channel(sid)
+        payload = self._serialize_state()
+        self._state_queues[sid].put_nowait(('system_state', payload))
+        # 此時所有客戶端皆已持有最新狀態，以此作為之後 state_patch 的比對基準
+        self._last_published_state = payload
+        await self.sio.emit('hardware_status', self._build_hardware_status(), room=sid)
+
+    async def _on_disconnect(self, sid):
+        # 客戶端斷開連線，清理追蹤清單
+        self.connected_clients.discard(sid)
+        self._close_state_channel(sid)
+        self._throttled_log('client_disconnect', f"[WS] 客戶端已斷開: {sid}", force=True)
+
+    async def _on_hardware_connect(self, sid, data):
+        # 處理實體硬體 (D1-mini) 發出的連線正式註冊事件
+        if self.mock_mode_active:
+            self._throttled_log('hw_ignored', "[硬體] 當前為模擬模式，忽略實體硬體連線請求", force=False)
+            return
 
-        @self.sio.event
-        async def heartbeat(sid, data):
-            # 靜默處理硬體心跳包，不進行日誌記錄
-            pass
+        hardware_id = data.get('hardware_id', 'UNKNOWN')
+        version = data.get('version', 'N/A')
+        board = data.get('board', 'D1-mini')
+        features = data.get('features', '')
+
+        # 根據硬體傳來的特徵字串判斷感測器配置
+        hall_detected = 'hall' in features or data.get('hall_detected', True)
+        radar_detected = 'radar' in features or data.get('radar_detected', True)
+        lcd_detected = 'lcd' in features
+        nfc_detected = data.get('nfc_detected', False)
+
+        self._throttled_log('hw_connect', f"[硬體] 已上線 - ID: {hardware_id}, 版本: {version}, 開發板: {board}", force=True)
+
+        self._state_manager.update_hardware_info(
+            hardware_id=hardware_id,
+            version=version,
+            features=features,
+            nfc_detected=nfc_detected,
+            ldr_detected=hall_detected,
+            radar_detected=radar_detected
+        )
 
-        @self.sio.event
-        async def state_change(sid, data):
-            # 處理硬體內建狀態機的切換事件
-            previous_state = data.get('previous_state', 'IDLE')
-            current_state = data.get('current_state', 'IDLE')
-            total_focus_time_ms = data.get('total_focus_time_ms', 0)
+        await self.broadcast_event('hardware_status', self._build_hardware_status(
+            hardware_id=hardware_id,
+            version=version,
+            board=board,
+            features=features,
+            lcd_detected=lcd_detected
+        ))
+
+    async def _on_subscribe_binary_state(self, sid, data=None):
+        # 客戶端要求改以 MessagePack 二進位格式接收 system_state（需安裝 msgpack）
+        if msgpack is None:
+            return {'success': False, 'message': '伺服器未安裝 msgpack，維持 JSON 格式'}
+        self._binary_state_clients.add(sid)
+        return {'success': True}
+
+    async def _on_heartbeat(self, sid, data):
+        # 靜默處理硬體心跳包，不進行日誌記錄
+        pass
+
+    async def _on_state_change(self, sid, data):
+        # 處理硬體內建狀態機的切換事件
+        previous_state = data.get('previous_state', 'IDLE')
+        current_state = data.get('current_state', 'IDLE')
+        total_focus_time_ms = data.get('total_focus_time_ms', 0)
+
+        self._throttled_log('state_change', f"[硬體狀態切換] {previous_state} → {current_state}", force=True)
+
+        try:
+            self._state_manager.state.hardware_state = HardwareState(current_state)
+        except ValueError:
+            self._state_manager.state.hardware_state = HardwareState.IDLE
+
+        # 如果硬體判定進入違規(VIOLATION)狀態，觸發後端違規檢核
+        if current_state == 'VIOLATION':
+            if self.state.session and self.state.session.status == SessionStatus.ACTIVE:
+                self._throttled_log('hw_violation', "[硬體] 硬體端主動回報違規！", force=True)
+                self._state_manager.state.box_status = BoxStatus.OPEN
+                # 使用進階懲罰系統記錄違規（會調用 daily_violation_store.increment()）
+                await self._progressive_penalty.record_violation("硬體偵測違規")
+        elif current_state == 'FOCUSING':
+            # 恢復專注狀態，通知遞進懲罰系統違規已解除
+            self._state_manager.state.box_status = BoxStatus.CLOSED
+            await self._progressive_penalty.violation_resolved()
+
+            if self.state.session and self.state.session.status == SessionStatus.VIOLATED:
+                self.state.session.status = SessionStatus.ACTIVE
+                logger.info("[專注協定] 違規已修正，恢復專注狀態")
+
+        self._state_manager.bump_version()
+        await self.broadcast_state(force=True)
+        await self.broadcast_event('hardware_state_change', {
+            'previous_state': previous_state,
+            'current_state': current_state,
+            'total_focus_time_ms': total_focus_time_ms
+        })
+
+    async def _on_sensor_data(self, sid, data):
+        # 接收並處理硬體原始感測器數據
+        if self.mock_mode_active:
+            return
 
-            self._throttled_log('state_change', f"[硬體狀態切換] {previous_state} → {current_state}", force=True)
+        ldr_detected = data.get('ldr_detected', False)
+        if ldr_detected is not None:
+            data['ldr_detected'] = ldr_detected
 
-            try:
-                self._state_manager.state.hardware_state = HardwareState(current_state)
-            except ValueError:
-                self._state_manager.state.hardware_state = HardwareState.IDLE
-
-            # 如果硬體判定進入違規(VIOLATION)狀態，觸發後端違規檢核
-            if current_state == 'VIOLATION':
-                if self.state.session and self.state.session.status == SessionStatus.ACTIVE:
-                    self._throttled_log('hw_violation', "[硬體] 硬體端主動回報違規！", force=True)
-                    self._state_manager.state.box_status = BoxStatus.OPEN
-                    # 使用進階懲罰系統記錄違規（會調用 daily_violation_store.increment()）
-                    await self._progressive_penalty.record_violation("硬體偵測違規")
-            elif current_state == 'FOCUSING':
-                # 恢復專注狀態，通知遞進懲罰系統違規已解除
-                self._state_manager.state.box_status = BoxStatus.CLOSED
-                await self._progressive_penalty.violation_resolved()
-
-                if self.state.session and self.state.session.status == SessionStatus.VIOLATED:
-                    self.state.session.status = SessionStatus.ACTIVE
-                    print("[專注協定] 違規已修正，恢復專注狀態")
+        # hardware_connect 未經驗證，任何客戶端皆可宣稱為硬體，因此外部數據一律完整驗證
+        await self.process_sensor_data(data)
 
+    async def _on_start_session(self, sid, data):
+        # 前端請求開始新的專注任務
+        duration = data.get('duration_minutes', 25)
+        await self.start_focus_session(duration)
+
+    async def _on_stop_session(self, sid, data):
+        # 前端請求終止專注任務
+        await self.stop_focus_session()
+
+    async def _on_update_penalty_settings(self, sid, data):
+        # 更新全域懲罰開關設定
+        try:
+            self._state_manager.state.penalty_settings = PenaltySettings(**data)
+            self._state_manager.bump_version()
+            self._state_manager.schedule_save_settings()
             await self.broadcast_state(force=True)
-            await self.broadcast_event('hardware_state_change', {
-                'previous_state': previous_state,
-                'current_state': current_state,
-                'total_focus_time_ms': total_focus_time_ms
-            })
-
-        @self.sio.event
-        async def sensor_data(sid, data):
-            # 接收並處理硬體原始感測器數據
-            if self.mock_mode_active:
-                return
-
-            ldr_detected = data.get('ldr_detected', False)
-            if ldr_detected is not None:
-                data['ldr_detected'] = ldr_detected
-
-            await self.process_sensor_data(data)
-
-        @self.sio.event
-        async def start_session(sid, data):
-            # 前端請求開始新的專注任務
-            duration = data.get('duration_minutes', 25)
-            await self.start_focus_session(duration)
-
-        @self.sio.event
-        async def stop_session(sid, data):
-            # 前端請求終止專注任務
-            await self.stop_focus_session()
-
-        @self.sio.event
-        async def update_penalty_settings(sid, data):
-            # 更新全域懲罰開關設定
-            try:
-                self._state_manager.state.penalty_settings = PenaltySettings(**data)
-                self._state_manager.save_settings()
-                await self.broadcast_state(force=True)
-            except Exception as e:
-                print(f"[錯誤] 更新懲罰開關失敗: {e}")
-
-        @self.sio.event
-        async def update_penalty_config(sid, data):
-            # 更新細粒度的懲罰類型設定
-            try:
-                self._state_manager.state.penalty_config = PenaltyConfig(**data)
-                if self.state.session:
-                    self.state.session.penalty_config = self.state.penalty_config
-                self._state_manager.save_settings()
-                print(f"[懲罰配置] 已更新: {self.state.penalty_config.model_dump()}")
-                await self.broadcast_state(force=True)
-            except Exception as e:
-                print(f"[錯誤] 更新懲罰細節配置失敗: {e}")
-
-        @self.sio.event
-        async def toggle_mock_hardware(sid, data):
-            # 開啟或關閉硬體模擬模式
-            enabled = data.get('enabled', False)
-            print(f"[模擬器] 切換請求: 客戶端要求啟用={enabled}, 當前狀態={self.mock_mode_active}")
-            if enabled:
-                await self.start_mock_hardware()
-            else:
-                await self.stop_mock_hardware()
+        except Exception as e:
+            logger.error("[錯誤] 更新懲罰開關失敗: %s", e)
+
+    async def _on_update_penalty_config(self, sid, data):
+        # 更新細粒度的懲罰類型設定
+        try:
+            config = PenaltyConfig(**data)
+            self._state_manager.state.penalty_config = config
+            if self.state.session:
+                # 配置不可變，任務直接共用同一物件
+                self.state.session.penalty_config = config
+            self._state_manager.bump_version()
+            self._state_manager.schedule_save_settings()
+            # 直接傳入模型物件，由 logging 在實際輸出時才格式化，不另外建立字典
+            logger.info("[懲罰配置] 已更新: %s", config)
+            await self.broadcast_state(force=True)
+        except Exception as e:
+            logger.error("[錯誤] 更新懲罰細節配置失敗: %s", e)
+
+    async def _on_toggle_mock_hardware(self, sid, data):
+        # 開啟或關閉硬體模擬模式
+        enabled = data.get('enabled', False)
+        logger.info("[模擬器] 切換請求: 客戶端要求啟用=%s, 當前狀態=%s", enabled, self.mock_mode_active)
+        if enabled:
+            await self.start_mock_hardware()
+        else:
+            await self.stop_mock_hardware()
 
     # =========================================================================
     # 感測器數據處理
     # =========================================================================
 
     async def _process_sensor_internal(self, data: Dict[str, Any]) -> None:
-        # 用於驅動模擬器數據注入的內部回呼
-        await self.process_sensor_data(data)
+        # 用於驅動模擬器數據注入的內部回呼（數據由模擬器自行組成，型別已確定，略過完整驗證）
+        await self.process_sensor_data(data, trusted=True)
 
-    async def process_sensor_data(self, data: Dict[str, Any]) -> None:
+    async def process_sensor_data(self, data: Dict[str, Any], trusted: bool = False) -> None:
         # 處理任何來源（實體或模擬）的感測器數據並更新全域狀態
-        sensor = self._state_manager.process_sensor_data(data, self.mock_mode_active)
+        # trusted 僅用於模擬器於程序內產生的數據，所有外部來源（Socket.IO、硬體 WebSocket）皆經過完整驗證
+        sensor = self._state_manager.process_sensor_data(data, self.mock_mode_active, trusted)
         if sensor is None:
             return
 
         # 每次數據更新後檢查是否觸發違規
         # 使用進階懲罰系統來檢測違規，而不是舊的 violation_checker
         if self.state.session and self.state.session.status == SessionStatus.ACTIVE:
-            # 檢查各項違規條件
-            config = self.state.session.penalty_config
+            # 依序執行已啟用的違規檢查，第一個適用的檢查即決定本次結果；
+            # 所有懲罰項目皆停用時清單為空，連同取得目前時間一併略過
             violation_detected = False
             violation_reason = ""
-            
-            # 1. 檢查手機是否被移除
-            if config.enable_phone_penalty and self.state.phone_status.value == 'REMOVED':
-                violation_detected = True
-                violation_reason = "手機被移出"
-            # 2. 檢查人員是否離開位置
-            elif config.enable_presence_penalty and self.state.person_away_since:
-                from datetime import datetime
-                away_duration = (datetime.now() - self.state.person_away_since).total_seconds()
-                if away_duration > config.presence_duration_sec:
-                    violation_detected = True
-                    violation_reason = f"人員離位 {away_duration:.1f} 秒"
-            # 3. 檢查盒子是否被打開
-            elif config.enable_box_open_penalty and self.state.box_status.value == 'OPEN':
-                violation_detected = True
-                violation_reason = "盒子被打開"
-            # 4. 檢查噴音持續違規
-            elif config.enable_noise_penalty and self.state.noise_status.value == 'NOISY':
-                if self.state.noise_start_time:
-                    from datetime import datetime
-                    noise_duration = (datetime.now() - self.state.noise_start_time).total_seconds()
-                    if noise_duration > config.noise_duration_sec:
-                        violation_detected = True
-                        violation_reason = f"噴音違規 ({self.state.current_db} dB)"
-                        self._state_manager.state.noise_start_time = None
-            
+            checks = self._get_penalty_checks(self.state.session.penalty_config)
+            if checks:
+                now = datetime.now()
+                for check in checks:
+                    result = check(self.state, now)
+                    if result is not None:
+                        violation_detected, violation_reason = result
+                        break
+
             if violation_detected:
                 # 只有新的違規才會觸發記錄，避免同一違規事件被重複計數
                 if not self._current_violation_recorded:
@@ -397,6 +502,69 @@ class SocketManager:
         
         await self.broadcast_state()
 
+    def _get_penalty_checks(
+        self, config: PenaltyConfig
+    ) -> List[PenaltyCheck]:
+        # 取得對應懲罰配置的違規檢查清單，僅在配置物件更換時重建
+        if config is not self._penalty_checks_config:
+            self._penalty_checks = self._build_penalty_checks(config)
+            self._penalty_checks_config = config
+        return self._penalty_checks
+
+    def _build_penalty_checks(
+        self, config: PenaltyConfig
+    ) -> List[PenaltyCheck]:
+        # 依配置建立違規檢查函式，回傳 None 時交由下一項檢查，否則即結束本次檢查；
+        # 未啟用的項目不會加入清單（噪音檢查會重置計時器，需透過 self 遞增狀態版本）
+        checks = []
+
+        # 1. 檢查手機是否被移除
+        if config.enable_phone_penalty:
+            def check_phone(state: SystemState, now: datetime) -> Optional[Tuple[bool, str]]:
+                if state.phone_status is PhoneStatus.REMOVED:
+                    return True, "手機被移出"
+                return None
+            checks.append(check_phone)
+
+        # 2. 檢查人員是否離開位置
+        if config.enable_presence_penalty:
+            # 門檻預先轉為 timedelta，每次檢查直接比較，僅在違規時才換算秒數
+            presence_limit = timedelta(seconds=config.presence_duration_sec)
+
+            def check_presence(state: SystemState, now: datetime) -> Optional[Tuple[bool, str]]:
+                if not state.person_away_since:
+                    return None
+                away = now - state.person_away_since
+                if away > presence_limit:
+                    return True, f"人員離位 {away.total_seconds():.1f} 秒"
+                return False, ""
+            checks.append(check_presence)
+
+        # 3. 檢查盒子是否被打開
+        if config.enable_box_open_penalty:
+            def check_box(state: SystemState, now: datetime) -> Optional[Tuple[bool, str]]:
+                if state.box_status is BoxStatus.OPEN:
+                    return True, "盒子被打開"
+                return None
+            checks.append(check_box)
+
+        # 4. 檢查噪音持續違規
+        if config.enable_noise_penalty:
+            noise_limit = timedelta(seconds=config.noise_duration_sec)
+
+            def check_noise(state: SystemState, now: datetime) -> Optional[Tuple[bool, str]]:
+                if state.noise_status is not NoiseStatus.NOISY:
+                    return None
+                if state.noise_start_time:
+                    if now - state.noise_start_time > noise_limit:
+                        state.noise_start_time = None
+                        self._state_manager.bump_version()
+                        return True, f"噴音違規 ({state.current_db} dB)"
+                return False, ""
+            checks.append(check_noise)
+
+        return checks
+
     # =========================================================================
     # 專注任務管理
     # =========================================================================
@@ -419,69 +587,78 @@ class SocketManager:
         # 如果目前環境音量已超過閾值，立即開始噪音計時
         if self._state_manager.state.noise_status == NoiseStatus.NOISY:
             self._state_manager.state.noise_start_time = datetime.now()
-            print("[專注協定] 偵測到環境音量已超標，開始計時...")
+            self._state_manager.bump_version()
+            logger.info("[專注協定] 偵測到環境音量已超標，開始計時...")
 
-        print(f"[專注協定] 已啟動 {duration_minutes} 分鐘專注任務")
-        print(f"[專注協定] 懲罰配置: {self.state.penalty_config.model_dump()}")
-        print(f"[專注協定] 遞進懲罰已啟用 (5秒寬限期)")
-        print(f"[專注協定] 今日違規次數: {daily_violation_store.get_count()}")
+        logger.info("[專注協定] 已啟動 %s 分鐘專注任務", duration_minutes)
+        logger.info("[專注協定] 懲罰配置: %s", self.state.penalty_config)
+        logger.info("[專注協定] 遞進懲罰已啟用 (5秒寬限期)")
+        logger.info("[專注協定] 今日違規次數: %s", daily_violation_store.get_count())
         if hostage_path:
-            print(f"[人質協定] 人質照片已綁定: {hostage_path}")
+            logger.info("[人質協定] 人質照片已綁定: %s", hostage_path)
 
-        await self.broadcast_state(force=True)
-        await self.sio.emit('command', {'command': 'START'})
+        await self._command_and_broadcast('START')
 
     async def stop_focus_session(self) -> None:
         # 停止當前任務，並將紀錄持久化存檔
         session = self.state.session
 
         if session:
-            print("[專注協定] 專注任務已結束")
+            logger.info("[專注協定] 專注任務已結束")
 
             try:
-                record = SessionRecord(
-                    id=session.id,
-                    start_time=session.start_time.isoformat() if session.start_time else datetime.now().isoformat(),
-                    end_time=datetime.now().isoformat(),
-                    duration_minutes=session.duration_minutes,
-                    status=session.status.value if session.status else "COMPLETED",
-                    violation_count=self._progressive_penalty.get_state_dict().get('count', 0),
-                    penalty_level=str(self._progressive_penalty.get_state_dict().get('level', 'NONE')),
-                    total_focus_time_seconds=int(session.elapsed_seconds or 0)
-                )
-                session_store.add_session(record)
-                print(f"[歷史紀錄] 任務 {session.id} 已存入資料庫")
+                # 欄位型別皆已確定，直接以字典交給 session_store，省去模型驗證與再序列化
+                penalty_state = self._progressive_penalty.get_state_dict()
+                # 結束時間只格式化一次，缺少開始時間時亦沿用同一字串
+                end_time = datetime.now().isoformat()
+                session_store.add_session({
+                    'id': session.id,
+                    'start_time': session.start_time.isoformat() if session.start_time else end_time,
+                    'end_time': end_time,
+                    'duration_minutes': session.duration_minutes,
+                    'status': session.status.value if session.status else "COMPLETED",
+                    'violation_count': penalty_state.get('count', 0),
+                    'penalty_level': str(penalty_state.get('level', 'NONE')),
+                    'total_focus_time_seconds': int(session.elapsed_seconds or 0)
+                })
+                logger.info("[歷史紀錄] 任務 %s 已存入資料庫", session.id)
             except Exception as e:
-                print(f"[歷史紀錄] 存檔失敗: {e}")
+                logger.error("[歷史紀錄] 存檔失敗: %s", e)
 
         # 停止專注時同步停止懲罰追蹤
         self._progressive_penalty.stop_session()
 
         self._state_manager.stop_session()
         self._violation_checker.set_hostage_path(None)
+        # 任務結束時順帶寫入尚未保存的設定
+        self._state_manager.flush_settings()
 
-        await self.sio.emit('command', {'command': 'STOP'})
-        await self.broadcast_state(force=True)
+        await self._command_and_broadcast('STOP')
 
     async def pause_focus_session(self) -> None:
         # 暫停專注任務（v1.0 新功能）
         if self._state_manager.pause_session():
-            await self.sio.emit('command', {'command': 'PAUSE'})
-            print(f"[專注協定] 專注任務已暫停 - 時間點: {self.state.session.paused_at.isoformat()}")
-            await self.broadcast_state(force=True)
+            logger.info("[專注協定] 專注任務已暫停 - 時間點: %s", self.state.session.paused_at)
+            await self._command_and_broadcast('PAUSE')
 
     async def resume_focus_session(self) -> None:
         # 恢復已被暫停的任務
         if self._state_manager.resume_session():
-            await self.sio.emit('command', {'command': 'RESUME'})
-            print("[專注協定] 專注任務已恢復")
-            await self.broadcast_state(force=True)
+            logger.info("[專注協定] 專注任務已恢復")
+            await self._command_and_broadcast('RESUME')
+
+    async def _command_and_broadcast(self, command: str) -> None:
+        # 任務狀態轉換時，硬體指令與最新狀態廣播互不相依，同時送出以省去一次等待
+        await asyncio.gather(
+            self.sio.emit('command', {'command': command}),
+            self.broadcast_state(force=True)
+        )
 
     async def acknowledge_violation(self) -> None:
         # 前端手動確認違規狀態並返回首頁
         if self.state.session and self.state.session.status == SessionStatus.VIOLATED:
             await self.sio.emit('command', {'command': 'ACKNOWLEDGE'})
-            print("[專注協定] 違規已確認，系統返回待機")
+            logger.info("[專注協定] 違規已確認，系統返回待機")
 
     # =========================================================================
     # 硬體模擬控制
@@ -490,8 +667,8 @@ class SocketManager:
     async def start_mock_hardware(self) -> None:
         # 啟動虛擬硬體，並根據需要接管實體硬體的權限
         if self._state_manager.hardware_connected and not self.mock_mode_active:
-            print("[模擬器] 偵測到實體硬體連線中 - 強制切換為模擬模式")
-            print("[模擬器] 之後將完全忽略來自實體開發板的數據流")
+            logger.info("[模擬器] 偵測到實體硬體連線中 - 強制切換為模擬模式")
+            logger.info("[模擬器] 之後將完全忽略來自實體開發板的數據流")
 
         def set_connected(value: bool):
             self._state_manager.hardware_connected = value
@@ -510,30 +687,206 @@ class SocketManager:
 
     async def set_mock_state(self, **kwargs) -> Dict[str, Any]:
         # 更新虛擬硬體的內部感測值（由前端模擬面板操作）
-        return await self._mock_controller.set_state(
-            broadcast_state_callback=lambda: self.broadcast_state(force=True),
-            **kwargs
-        )
+        return await self._mock_controller.set_state(**kwargs)
 
     # =========================================================================
     # 狀態廣播機制
     # =========================================================================
 
+    def mark_state_changed(self) -> None:
+        # 外部直接修改 state 後呼叫，使序列化快取與公開快照失效
+        self._state_manager.bump_version()
+        self._public_snapshot = None
+
     def _serialize_state(self) -> Dict[str, Any]:
-        # 將 Pydantic 模型狀態序列化為 JSON 友善格式
+        # 將 Pydantic 模型狀態序列化為 JSON 友善格式（狀態未變時沿用快取結果）
         return self._state_manager.serialize_state()
 
     async def broadcast_state(self, force: bool = False) -> None:
         # 將最新系統狀態分發給所有前端連線
+        # 所有狀態異動最終都會經過此處，因此在節流判斷前先使快照失效
+        # （序列化快取依狀態版本號判斷，由修改狀態的呼叫端負責遞增）
+        self._public_snapshot = None
         if not force and not self._state_manager.should_broadcast():
+            # 節流期間的多次更新合併為間隔結束時的一次廣播
+            if self._pending_broadcast is None:
+                self._pending_broadcast = asyncio.create_task(self._flush_pending_broadcast())
             return
 
         self._state_manager.mark_broadcast()
-        await self.sio.emit('system_state', self._serialize_state())
+        # 強制廣播前先送出已累積的事件，維持事件與狀態之間的先後順序
+        if self._pending_events:
+            await self._flush_events()
+        self._publish_state()
+        # 讓各客戶端的發送任務先送出狀態，維持與後續事件之間的先後順序
+        await asyncio.sleep(0)
+
+    async def _flush_pending_broadcast(self) -> None:
+        # 等待節流間隔結束後，補發節流期間累積的狀態更新
+        await asyncio.sleep(self._state_manager.seconds_until_broadcast())
+        # 先清除標記再序列化，之後的更新會再排程下一次補發
+        self._pending_broadcast = None
+        self._state_manager.mark_broadcast()
+        try:
+            self._publish_state()
+        except Exception as e:
+            logger.error("[錯誤] 補發狀態廣播失敗: %s", e)
+
+    def _publish_state(self) -> None:
+        # 將最新狀態放入每個客戶端的佇列：JSON 客戶端只收到與上次推送相比有變動的欄位 (state_patch)，
+        # 佇列中尚未送出的舊項目會與新項目合併，確保較慢的客戶端不會遺漏任何欄位變動
+        if not self._state_queues:
+            # 沒有任何前端連線時略過序列化與差異比對；新連線會直接收到完整狀態
+            return
+        payload = self._serialize_state()
+        last = self._last_published_state
+        if last is None:
+            item = ('system_state', payload)
+        else:
+            delta = {key: value for key, value in payload.items() if key not in last or last[key] != value}
+            # 狀態內容與上次推送完全相同（例如盒子關閉、手機在位、環境安靜）時不重複推送
+            if not delta:
+                return
+            item = ('state_patch', delta)
+        self._last_published_state = payload
+
+        binary_clients = self._binary_state_clients
+        packed_item = ('system_state_bin', msgpack.packb(payload, use_bin_type=True)) if binary_clients else None
+        for sid, queue in self._state_queues.items():
+            new_item = packed_item if sid in binary_clients else item
+            if queue.full():
+                new_item = self._merge_state_items(queue.get_nowait(), new_item)
+            queue.put_nowait(new_item)
+
+    @staticmethod
+    def _merge_state_items(
+        old: Tuple[str, Any], new: Tuple[str, Any]
+    ) -> Tuple[str, Any]:
+        # 新項目為完整狀態時直接取代舊項目；為差異欄位時疊加於舊項目之上並沿用舊項目的事件類型
+        if new[0] != 'state_patch':
+            return new
+        return old[0], {**old[1], **new[1]}
+
+    def _open_state_channel(self, sid: str) -> None:
+        # 為新連線的客戶端建立狀態佇列與專屬的發送任務
+        queue: asyncio.Queue = asyncio.Queue(maxsize=1)
+        self._state_queues[sid] = queue
+        self._state_senders[sid] = asyncio.create_task(self._state_sender(sid, queue))
+
+    def _close_state_channel(self, sid: str) -> None:
+        # 客戶端斷線時移除其佇列並停止發送任務
+        self._state_queues.pop(sid, None)
+        self._binary_state_clients.discard(sid)
+        sender = self._state_senders.pop(sid, None)
+        if sender is not None:
+            sender.cancel()
+
+    async def _state_sender(self, sid: str, queue: asyncio.Queue) -> None:
+        # 依序送出佇列中的最新狀態；前一筆尚未送完時新狀態會在佇列中被合併
+        while True:
+            # system_state_bin 的 bytes 內容由 Socket.IO 以二進位訊框送出
+            event, payload = await queue.get()
+            try:
+                await self.sio.emit(event, payload, room=sid)
+            except Exception as e:
+                logger.error("[錯誤] 狀態推送至客戶端 %s 失敗: %s", sid, e)
 
     async def broadcast_event(self, event: str, data: Dict[str, Any]) -> None:
-        # 發送通用自定義事件
-        await self.sio.emit(event, data)
+        # 發送通用自定義事件（硬體狀態類事件代表狀態已變動，同步使快照失效）
+        # 事件僅放入待送清單，實際送出由背景任務負責，呼叫端不需等待各連線送出完成
+        self._public_snapshot = None
+        if not self.connected_clients:
+            # 沒有任何連線時事件無人接收，直接捨棄；去重紀錄一併清除，
+            # 避免之後連線的客戶端因與舊紀錄相同而漏收事件
+            self._last_event_payloads.clear()
+            return
+        if event in self.DEDUP_EVENTS:
+            if self._last_event_payloads.get(event) == data:
+                return
+            self._last_event_payloads[event] = data
+        self._pending_events.append((event, data))
+        if len(self._pending_events) >= self.EVENT_COALESCE_MAX:
+            # 累積達上限時立即於背景送出，不等待合併視窗結束
+            task = asyncio.create_task(self._flush_events_logged())
+            self._background_tasks.add(task)
+            task.add_done_callback(self._on_background_task_done)
+        elif self._event_flush_task is None:
+            self._event_flush_task = asyncio.create_task(self._delayed_event_flush())
+
+    def _on_background_task_done(self, task: asyncio.Task) -> None:
+        # 背景任務結束時移除參照（送出失敗已由 _flush_events_logged 記錄）
+        self._background_tasks.discard(task)
+
+    async def _delayed_event_flush(self) -> None:
+        # 等待合併視窗結束後送出期間累積的事件
+        await asyncio.sleep(self.EVENT_COALESCE_SEC)
+        self._event_flush_task = None
+        await self._flush_events_logged()
+
+    async def _flush_events_logged(self) -> None:
+        # 背景送出待送事件；送出失敗只記錄日誌，不影響呼叫端
+        try:
+            await self._flush_events()
+        except Exception as e:
+            logger.error("[錯誤] 事件廣播失敗: %s", e)
+
+    async def _flush_events(self) -> None:
+        # 取出所有待送事件：僅一筆時以原事件名稱送出，多筆時合併為單一 batch 事件
+        events, self._pending_events = self._pending_events, []
+        if not events:
+            return
+        if len(events) == 1:
+            await self._batched_emit(*events[0])
+        else:
+            await self._batched_emit('batch', [[event, data] for event, data in events])
+
+    async def _batched_emit(self, event: str, data: Any) -> None:
+        # 客戶端數量少時維持單次廣播；數量多時分批送出並於批次間讓出事件迴圈，
+        # 避免單次廣播長時間佔用事件迴圈而延遲下一筆感測器數據的處理
+        # 先取出快照，避免分批等待期間有客戶端連線或斷線而改動集合
+        sids = tuple(self.connected_clients)
+        batch_size = self.BROADCAST_BATCH_SIZE
+        if len(sids) <= batch_size:
+            await self.sio.emit(event, data)
+            return
+
+        for start in range(0, len(sids), batch_size):
+            await asyncio.gather(*(
+                self.sio.emit(event, data, room=sid)
+                for sid in sids[start:start + batch_size]
+            ))
+            await asyncio.sleep(0)
+
+    def snapshot(self) -> Dict[str, Any]:
+        # 取得 REST 端點使用的公開狀態快照，僅在狀態變動後才重新序列化
+        if self._public_snapshot is None:
+            nfc_detected, ldr_detected, radar_detected = self.get_sensor_detection_status()
+            # 會話與感測數據直接取自已快取的 JSON 模式序列化結果，不再各自 model_dump 一次
+            serialized = self._serialize_state()
+            self._public_snapshot = {
+                'hardware': {
+                    'connected': self._state_manager.hardware_connected,
+                    'mock_mode': self.mock_mode_active,
+                    'mock_state': self._mock_state.to_dict(),
+                    'last_sensor_data': serialized['last_sensor_data'],
+                    'nfc_detected': nfc_detected,
+                    'ldr_detected': ldr_detected,
+                    'hall_detected': ldr_detected,  # v1.0：霍爾感測器與 LDR 共用邏輯位
+                    'ir_detected': ldr_detected,    # 提供 ir_detected 以維持前端相容性
+                    'radar_detected': radar_detected,
+                    'lcd_detected': 'lcd' in self._state_manager.hardware_features,
+                    'hardware_state': serialized['hardware_state'],
+                    'firmware_version': self._state_manager.hardware_firmware_version
+                },
+                'session': {
+                    'session': serialized['session'],
+                    'phone_status': serialized['phone_status'],
+                    'presence_status': serialized['presence_status'],
+                    'current_db': serialized['current_db'],
+                    'hardware_state': serialized['hardware_state']
+                }
+            }
+        return self._public_snapshot
 
     # =========================================================================
     # 硬體狀態彙整
@@ -545,25 +898,36 @@ class SocketManager:
 
     def _build_hardware_status(self, **overrides) -> Dict[str, Any]:
         # 構建傳送給前端的詳細硬體診斷資訊包
-        nfc_detected, ldr_detected, radar_detected = self.get_sensor_detection_status()
-
-        # 模擬模式時視為「已連線」且硬體狀態為可用
-        is_connected = self._state_manager.hardware_connected or self.mock_mode_active
-
-        status = {
-            'connected': is_connected,
-            'mock_mode': self.mock_mode_active,
-            'mock_state': self._mock_state.to_dict(),
-            'nfc_detected': nfc_detected,
-            'ldr_detected': ldr_detected,
-            'hall_detected': ldr_detected,
-            'ir_detected': ldr_detected,
-            'radar_detected': radar_detected,
-            'lcd_detected': 'lcd' in self._state_manager.hardware_features,
-            'hardware_state': self.state.hardware_state.value,
-            'firmware_version': self._state_manager.hardware_firmware_version
-        }
-
+        sm = self._state_manager
+        key = (
+            sm.hardware_connected,
+            self.mock_mode_active,
+            self.get_sensor_detection_status(),
+            sm.hardware_features,
+            self.state.hardware_state,
+            sm.hardware_firmware_version
+        )
+        cached = self._hw_status_template
+        if cached is None or cached[0] != key:
+            nfc_detected, ldr_detected, radar_detected = key[2]
+            template = {
+                # 模擬模式時視為「已連線」且硬體狀態為可用
+                'connected': sm.hardware_connected or self.mock_mode_active,
+                'mock_mode': self.mock_mode_active,
+                'mock_state': None,
+                'nfc_detected': nfc_detected,
+                'ldr_detected': ldr_detected,
+                'hall_detected': ldr_detected,
+                'ir_detected': ldr_detected,
+                'radar_detected': radar_detected,
+                'lcd_detected': 'lcd' in sm.hardware_features,
+                'hardware_state': self.state.hardware_state.value,
+                'firmware_version': sm.hardware_firmware_version
+            }
+            cached = self._hw_status_template = (key, template)
+
+        status = cached[1].copy()
+        status['mock_state'] = self._mock_state.to_dict()
         status.update(overrides)
         return status
 
@@ -571,17 +935,17 @@ class SocketManager:
     # 輔助工具方法
     # =========================================================================
 
-    def _throttled_log(self, log_key: str, message: str, force: bool = False) -> None:
+    def _throttled_log(self, log_key: str, message: str, force: bool = False, args: tuple = ()) -> None:
         # 對高頻日誌進行節流處理，避免終端機刷屏
+        # 帶有 args 時 message 為 % 格式字串，僅在實際輸出時才由 logging 格式化
         if force:
-            print(message)
+            logger.info(message, *args)
             return
 
-        now = datetime.now()
-        last_time = self.last_log_time.get(log_key)
-
-        if last_time is None or (now - last_time).total_seconds() >= self.log_throttle_seconds:
-            print(message)
+        # 從未輸出過的 key 視為負無限大，單一比較即可涵蓋首次輸出
+        now = time.monotonic()
+        if now - self.last_log_time.get(log_key, _NEVER_LOGGED) >= self.log_throttle_seconds:
+            logger.info(message, *args)
             self.last_log_time[log_key] = now
 
     async def _reset_system_state(self) -> None:
@@ -589,6 +953,10 @@ class SocketManager:
         self._state_manager.reset_state()
         await self.broadcast_state(force=True)
 
+    def flush_settings(self) -> None:
+        # 立即寫入尚未保存的設定（伺服器關閉時由 main.py 呼叫）
+        self._state_manager.flush_settings()
+
     def register_penalty_callback(self, callback: Callable) -> None:
         # 讓外部模組（如 social_manager）註冊懲罰執行的行為
         self._violation_checker.register_callback(callback)
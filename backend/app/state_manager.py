@@ -5,11 +5,16 @@
 從 socket_manager.py 抽離出來，以實現更好的關注點分離。
 """
 
-import json
+import asyncio
+import logging
+import time
+import uuid
 from pathlib import Path
 from datetime import datetime
 from typing import Optional, Dict, Any
 
+import orjson
+
 from .models import (
     SystemState, SensorData, PhoneStatus, PresenceStatus,
     BoxStatus, NoiseStatus, HardwareState, SessionStatus,
@@ -17,6 +22,32 @@ from .models import (
 )
 
 from .daily_violation_store import daily_violation_store
+from .logger import logger
+
+
+# 硬體回報的狀態字串與 HardwareState 的對照表
+_HARDWARE_STATES: Dict[str, HardwareState] = {member.value: member for member in HardwareState}
+
+# 每筆感測數據都會比對的列舉成員，預先綁定為模組常數以省去類別屬性查詢
+_PRESENCE_DETECTED = PresenceStatus.DETECTED
+
+# 感測器狀態轉移表，依序為：狀態屬性、條件成立時的值、條件不成立時的值、
+# 轉入成立值時的日誌、轉入不成立值時的日誌
+# 日誌格式為 (日誌 key, 訊息, 僅在由此狀態轉入時記錄；None 表示任何變化皆記錄)，None 表示不記錄
+_STATUS_TRANSITIONS = (
+    ('phone_status', PhoneStatus.LOCKED, PhoneStatus.REMOVED,
+     ('phone_locked', "[狀態] ✓ 手機已放入盒子並鎖定", None),
+     ('phone_removed', "[警報] ⚠️  手機已被移出盒子！", PhoneStatus.LOCKED)),
+    ('presence_status', PresenceStatus.DETECTED, PresenceStatus.AWAY,
+     ('person_detected', "[狀態] ✓ 偵測到人員在位", None),
+     ('person_away', "[狀態] ⚠️  人員離開 - 開始計時監控...", PresenceStatus.DETECTED)),
+    ('box_status', BoxStatus.OPEN, BoxStatus.CLOSED,
+     ('box_open', "[警報] ⚠️  盒子已被打開！", None),
+     ('box_closed', "[狀態] ✓ 盒子已關閉", None)),
+    ('noise_status', NoiseStatus.NOISY, NoiseStatus.QUIET,
+     ('noise_detected', "[警報] ⚠️  偵測到環境噪音過大 ({mic_db} dB)", None),
+     None),
+)
 
 
 class StateManager:
@@ -33,6 +64,9 @@ class StateManager:
     # 設定檔存放路徑
     CONFIG_FILE = Path("config/settings.json")
 
+    # 設定檔延遲寫入：短時間內的多次修改合併為一次寫檔
+    SETTINGS_FLUSH_DELAY_SEC = 0.5
+
     def __init__(
         self,
         log_callback,
@@ -41,7 +75,7 @@ class StateManager:
         """初始化狀態管理器。
 
         Args:
-            log_callback: 用於記錄日誌的回呼函式 (key, message, force)
+            log_callback: 用於記錄日誌的回呼函式 (key, message, force[, args])
             initial_state: 可選的初始系統狀態
         """
         self._log = log_callback
@@ -58,9 +92,19 @@ class StateManager:
         self.physical_ldr_detected: bool = False
         self.physical_radar_detected: bool = True
 
-        # 廣播節流機制設定
-        self.last_broadcast_time: Optional[datetime] = None
+        # 廣播節流機制設定（以 time.monotonic() 秒數記錄，不受系統時間調整影響）
+        self.last_broadcast_time: Optional[float] = None
         self.broadcast_throttle_ms: int = 200
+
+        # 狀態版本號：狀態異動時遞增，序列化結果僅在版本改變後才重新產生
+        self.state_version: int = 0
+        self._serialized_cache: Optional[Dict[str, Any]] = None
+        self._serialized_version: int = -1
+        self._serialized_daily_count: int = -1
+
+        # 設定檔延遲寫入的狀態
+        self._settings_dirty: bool = False
+        self._settings_flush_task: Optional[asyncio.Task] = None
         
         # 啟動時先載入上次保存的設定
         self.load_settings()
@@ -69,15 +113,16 @@ class StateManager:
         """從 JSON 檔案載入系統設定。"""
         try:
             if self.CONFIG_FILE.exists():
-                with open(self.CONFIG_FILE, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                    
+                data = orjson.loads(self.CONFIG_FILE.read_bytes())
+
                 if 'penalty_settings' in data:
                     # 使用 Pydantic 模型進行預設驗證
                     self.state.penalty_settings = PenaltySettings(**data['penalty_settings'])
                     
                 if 'penalty_config' in data:
                     self.state.penalty_config = PenaltyConfig(**data['penalty_config'])
+
+                self.bump_version()
                     
                 self._log('settings_loaded', "[系統] 已從檔案載入設定內容", False)
         except Exception as e:
@@ -89,44 +134,72 @@ class StateManager:
             self.CONFIG_FILE.parent.mkdir(parents=True, exist_ok=True)
             
             data = {
-                'penalty_settings': self.state.penalty_settings.model_dump(),
-                'penalty_config': self.state.penalty_config.model_dump()
+                'penalty_settings': self.state.penalty_settings.model_dump(mode='json'),
+                'penalty_config': self.state.penalty_config.model_dump(mode='json')
             }
-            
-            with open(self.CONFIG_FILE, 'w', encoding='utf-8') as f:
-                json.dump(data, f, indent=2, ensure_ascii=False)
-                
+
+            # 設定檔可能由使用者手動編輯，維持兩格縮排；orjson 輸出即為 UTF-8 且不跳脫非 ASCII 字元
+            self.CONFIG_FILE.write_bytes(orjson.dumps(data, option=orjson.OPT_INDENT_2))
+
             self._log('settings_saved', "[系統] 設定內容已保存至檔案", False)
         except Exception as e:
             self._log('settings_save_error', f"[錯誤] 保存設定檔失敗: {e}", True)
 
-    def serialize_state(self) -> Dict[str, Any]:
-        """序列化系統狀態以供傳輸。
+    def bump_version(self) -> None:
+        """標記狀態已異動，使快取的序列化結果失效。
 
-        將內部狀態模型轉換為字典格式，並處理 datetime 對象的轉換。
+        直接修改 self.state 的呼叫端需自行呼叫；廣播本身不會遞增版本號。
         """
-        state_dict = self.state.model_dump()
+        self.state_version += 1
 
-        # 將日期時間對象轉換為 ISO 格式字串，前端才能正常解析
-        if self.state.session:
-            if self.state.session.start_time:
-                state_dict['session']['start_time'] = self.state.session.start_time.isoformat()
-            if self.state.session.end_time:
-                state_dict['session']['end_time'] = self.state.session.end_time.isoformat()
-            if self.state.session.paused_at:
-                state_dict['session']['paused_at'] = self.state.session.paused_at.isoformat()
+    def schedule_save_settings(self) -> None:
+        """標記設定已變更，並排程於短暫延遲後寫回磁碟。
 
-        if self.state.person_away_since:
-            state_dict['person_away_since'] = self.state.person_away_since.isoformat()
+        延遲期間的多次修改會合併為一次寫檔；若目前沒有執行中的事件迴圈則立即寫入。
+        """
+        self._settings_dirty = True
 
-        # 噪音開始時間也需要轉換為 ISO 格式
-        if self.state.noise_start_time:
-            state_dict['noise_start_time'] = self.state.noise_start_time.isoformat()
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            self.flush_settings()
+            return
+
+        if self._settings_flush_task is None or self._settings_flush_task.done():
+            self._settings_flush_task = loop.create_task(self._delayed_settings_flush())
+
+    async def _delayed_settings_flush(self) -> None:
+        """等待合併視窗結束後將設定寫回磁碟。"""
+        await asyncio.sleep(self.SETTINGS_FLUSH_DELAY_SEC)
+        self.flush_settings()
+
+    def flush_settings(self) -> None:
+        """立即寫入尚未保存的設定（亦於任務結束與伺服器關閉時呼叫）。"""
+        if not self._settings_dirty:
+            return
+        self._settings_dirty = False
+        self.save_settings()
 
-        # 將列舉值轉換為其背後的原始值
-        state_dict['hardware_state'] = self.state.hardware_state.value
-        state_dict['today_violation_count'] = daily_violation_store.get_count()
+    def serialize_state(self) -> Dict[str, Any]:
+        """序列化系統狀態以供傳輸。
 
+        將內部狀態模型轉換為字典格式，並處理 datetime 對象的轉換。
+        狀態版本未變時直接回傳上次的結果，呼叫端不得修改回傳的字典。
+        """
+        # 今日違規次數由 daily_violation_store 另行維護，其變動同樣需使快取失效
+        daily_count = daily_violation_store.get_count()
+        if self._serialized_version == self.state_version and self._serialized_daily_count == daily_count:
+            return self._serialized_cache
+
+        # 以 JSON 模式匯出，日期時間直接轉為 ISO 格式字串、列舉轉為原始值，前端才能正常解析；
+        # 此路徑由 pydantic-core 以原生程式碼完成，改以 __dict__ 搭配 orjson 往返轉換僅快約兩成，
+        # 且結果仍須是獨立的字典（供差異推送比對），因此維持 model_dump
+        state_dict = self.state.model_dump(mode='json')
+        state_dict['today_violation_count'] = daily_count
+
+        self._serialized_cache = state_dict
+        self._serialized_version = self.state_version
+        self._serialized_daily_count = daily_count
         return state_dict
 
     def should_broadcast(self) -> bool:
@@ -134,16 +207,22 @@ class StateManager:
 
         用於控制 Socket 推送頻率，避免網路擁塞。
         """
-        now = datetime.now()
-        if self.last_broadcast_time:
-            elapsed_ms = (now - self.last_broadcast_time).total_seconds() * 1000
+        if self.last_broadcast_time is not None:
+            elapsed_ms = (time.monotonic() - self.last_broadcast_time) * 1000
             if elapsed_ms < self.broadcast_throttle_ms:
                 return False
         return True
 
+    def seconds_until_broadcast(self) -> float:
+        """距離節流間隔結束還需等待的秒數（已可廣播時為 0）。"""
+        if self.last_broadcast_time is None:
+            return 0.0
+        elapsed_ms = (time.monotonic() - self.last_broadcast_time) * 1000
+        return max(self.broadcast_throttle_ms - elapsed_ms, 0.0) / 1000
+
     def mark_broadcast(self) -> None:
         """標記目前時間為最後一次廣播時間。"""
-        self.last_broadcast_time = datetime.now()
+        self.last_broadcast_time = time.monotonic()
 
     def get_sensor_detection_status(self, mock_mode_active: bool) -> tuple[bool, bool, bool]:
         """獲取各感測器的當前偵測可用性狀態。
@@ -171,6 +250,7 @@ class StateManager:
         self.state.box_status = BoxStatus.UNKNOWN
         self.state.noise_status = NoiseStatus.UNKNOWN
         self.state.person_away_since = None
+        self.bump_version()
         self._log('state_reset', "[系統] 由於硬體模式切換，全域狀態已重置", True)
 
     def update_hardware_info(
@@ -190,122 +270,109 @@ class StateManager:
         self.physical_nfc_detected = nfc_detected
         self.physical_ldr_detected = ldr_detected
         self.physical_radar_detected = radar_detected
+        self.bump_version()
 
     def process_sensor_data(
         self,
         data: Dict[str, Any],
-        mock_mode_active: bool
+        mock_mode_active: bool,
+        trusted: bool = False
     ) -> Optional[SensorData]:
-        """處理傳入的感測器原始數據，並更新對應的系統狀態屬性。"""
+        """處理傳入的感測器原始數據，並更新對應的系統狀態屬性。
+
+        Args:
+            data: 感測器原始數據
+            mock_mode_active: 是否處於模擬模式
+            trusted: 數據是否由模擬器於程序內產生。為 True 時僅轉換判斷用的關鍵欄位型別，
+                以 model_construct 略過完整的欄位驗證；外部來源的數據不可設為 True
+        """
         try:
             # 正規化 nfc_id：將空字串視為無標籤 (None)
-            if 'nfc_id' in data and data['nfc_id'] == '':
-                data['nfc_id'] = None
+            data['nfc_id'] = data.get('nfc_id') or None
 
             # 相容性處理：v1.0 使用 box_locked，新版本統稱為 box_open
             if 'box_open' not in data:
                 data['box_open'] = not data.get('box_locked', True)
 
-            sensor = SensorData(**data)
+            if trusted:
+                data['box_open'] = bool(data['box_open'])
+                data['radar_presence'] = bool(data.get('radar_presence', False))
+                data['mic_db'] = int(data.get('mic_db', 40))
+                sensor = SensorData.model_construct(**data)
+            else:
+                sensor = SensorData(**data)
             self.state.last_sensor_data = sensor
             self.state.current_db = sensor.mic_db
 
             # 從感測數據中同步更新硬體內部的狀態機狀態
             if sensor.state:
-                try:
-                    self.state.hardware_state = HardwareState(sensor.state)
-                except ValueError:
-                    pass
+                # 以對照表查詢，未知的狀態字串直接忽略，不經過列舉建構與例外處理
+                hardware_state = _HARDWARE_STATES.get(sensor.state)
+                if hardware_state is not None:
+                    self.state.hardware_state = hardware_state
 
             # 依序更新各個子狀態
-            self._update_phone_status(sensor, mock_mode_active)
-            self._update_presence_status(sensor)
-            self._update_box_status(sensor)
-            self._update_noise_status(sensor)
+            self._apply_status_transitions(sensor, mock_mode_active)
+            self.bump_version()
 
             return sensor
 
         except Exception as e:
-            import traceback
-            print(f"[錯誤] 感測器數據解析失敗: {e}")
-            print(f"[錯誤] 堆疊追蹤: {traceback.format_exc()}")
-            print(f"[錯誤] 原始數據內容: {data}")
+            # 硬體異常時錯誤可能以感測頻率連續出現，依例外類型節流輸出；
+            # 堆疊追蹤與原始數據僅在開啟 DEBUG 時才格式化輸出
+            self._log(f'sensor_error_{type(e).__name__}', "[錯誤] 感測器數據解析失敗: %s", False, (e,))
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("[偵錯] 原始數據內容: %r", data, exc_info=True)
             return None
 
-    def _update_phone_status(self, sensor: SensorData, mock_mode_active: bool) -> None:
-        """依據感測器數據更新手機鎖定狀態。"""
+    def _apply_status_transitions(self, sensor: SensorData, mock_mode_active: bool) -> None:
+        """依據感測器數據一次更新手機、人員、盒子與噪音四項狀態。"""
+        state = self.state
+
         if mock_mode_active:
             # 模擬模式：開蓋不會導致 NFC 訊號遺失，主要看 NFC ID 是否存在
-            if sensor.nfc_id:
-                if self.state.phone_status != PhoneStatus.LOCKED:
-                    self._log('phone_locked', "[狀態] ✓ 手機已放入盒子並鎖定", True)
-                self.state.phone_status = PhoneStatus.LOCKED
-            else:
-                if self.state.phone_status == PhoneStatus.LOCKED:
-                    self.state.phone_status = PhoneStatus.REMOVED
-                    self._log('phone_removed', "[警報] ⚠️  手機已被移出盒子！", True)
-                else:
-                    self.state.phone_status = PhoneStatus.REMOVED
+            phone_locked = bool(sensor.nfc_id)
         else:
             # 實體模式：受硬體特性影響，開蓋可能導致 NFC 天線訊號不穩，因此開蓋或無 ID 皆視為移出
-            if sensor.nfc_id and not sensor.box_open:
-                if self.state.phone_status != PhoneStatus.LOCKED:
-                    self._log('phone_locked', "[狀態] ✓ 手機已放入盒子並鎖定", True)
-                self.state.phone_status = PhoneStatus.LOCKED
-            elif not sensor.nfc_id or sensor.box_open:
-                if self.state.phone_status == PhoneStatus.LOCKED:
-                    self.state.phone_status = PhoneStatus.REMOVED
-                    self._log('phone_removed', "[警報] ⚠️  手機已被移出盒子！", True)
-                else:
-                    self.state.phone_status = PhoneStatus.REMOVED
-
-    def _update_presence_status(self, sensor: SensorData) -> None:
-        """依據雷達感測值更新人員在位狀態。"""
+            phone_locked = bool(sensor.nfc_id) and not sensor.box_open
+
+        conditions = (
+            phone_locked,
+            sensor.radar_presence,
+            sensor.box_open,
+            sensor.mic_db >= state.penalty_config.noise_threshold_db,
+        )
+        previous_presence = state.presence_status
+
+        for (attr, on_value, off_value, on_log, off_log), condition in zip(_STATUS_TRANSITIONS, conditions):
+            new_value = on_value if condition else off_value
+            current = getattr(state, attr)
+            if current is new_value:
+                continue
+            log = on_log if condition else off_log
+            if log is not None and (log[2] is None or current is log[2]):
+                self._log(log[0], log[1].format(mic_db=sensor.mic_db), True)
+            setattr(state, attr, new_value)
+
+        # 人員離開時開始計時（僅在由「在位」轉為「離開」時），回到座位即清除
         if sensor.radar_presence:
-            if self.state.presence_status != PresenceStatus.DETECTED:
-                self._log('person_detected', "[狀態] ✓ 偵測到人員在位", True)
-            self.state.presence_status = PresenceStatus.DETECTED
-            self.state.person_away_since = None
-        else:
-            if self.state.presence_status == PresenceStatus.DETECTED:
-                self.state.person_away_since = datetime.now()
-                self._log('person_away', "[狀態] ⚠️  人員離開 - 開始計時監控...", True)
-            self.state.presence_status = PresenceStatus.AWAY
-
-    def _update_box_status(self, sensor: SensorData) -> None:
-        """依據 LDR/紅外線感測值更新盒子開關狀態。"""
-        if sensor.box_open:
-            if self.state.box_status != BoxStatus.OPEN:
-                self._log('box_open', "[警報] ⚠️  盒子已被打開！", True)
-            self.state.box_status = BoxStatus.OPEN
-        else:
-            if self.state.box_status != BoxStatus.CLOSED:
-                self._log('box_closed', "[狀態] ✓ 盒子已關閉", True)
-            self.state.box_status = BoxStatus.CLOSED
-
-    def _update_noise_status(self, sensor: SensorData) -> None:
-        """依據麥克風分貝值更新環境噪音狀態。"""
-        noise_threshold = self.state.penalty_config.noise_threshold_db
-        if sensor.mic_db >= noise_threshold:
-            if self.state.noise_status != NoiseStatus.NOISY:
-                self._log('noise_detected', f"[警報] ⚠️  偵測到環境噪音過大 ({sensor.mic_db} dB)", True)
-            self.state.noise_status = NoiseStatus.NOISY
-        else:
-            self.state.noise_status = NoiseStatus.QUIET
+            state.person_away_since = None
+        elif previous_presence is _PRESENCE_DETECTED:
+            state.person_away_since = datetime.now()
 
     # 專注任務相關管理方法
 
     def start_session(self, duration_minutes: int) -> FocusSession:
         """初始化並啟動一個新的專注任務。"""
-        import uuid
-
         self.state.session = FocusSession(
             id=str(uuid.uuid4()),
             duration_minutes=duration_minutes,
             start_time=datetime.now(),
             status=SessionStatus.ACTIVE,
+            # 配置不可變，更新全域配置時會換成新物件，不會連帶改動此任務
             penalty_config=self.state.penalty_config
         )
+        self.bump_version()
 
         return self.state.session
 
@@ -315,12 +382,14 @@ class StateManager:
             self.state.session.status = SessionStatus.COMPLETED
             self.state.session.end_time = datetime.now()
             self.state.session = None
+            self.bump_version()
 
     def pause_session(self) -> bool:
         """暫停當前的專注任務。"""
         if self.state.session and self.state.session.status == SessionStatus.ACTIVE:
             self.state.session.paused_at = datetime.now()
             self.state.session.status = SessionStatus.PAUSED
+            self.bump_version()
             return True
         return False
 
@@ -333,5 +402,6 @@ class StateManager:
                 self.state.session.paused_at = None
 
             self.state.session.status = SessionStatus.ACTIVE
+            self.bump_version()
             return True
         return False
@@ -5,6 +5,7 @@
 從 socket_manager.py 抽離出來，確保邏輯模組化。
 """
 
+import time
 from datetime import datetime
 from typing import Callable, List, Optional
 
@@ -13,6 +14,7 @@ from .models import (
     SessionStatus, PenaltyConfig
 )
 from .config import settings
+from .daily_violation_store import daily_violation_store
 from .logger import safe_print
 
 
@@ -25,21 +27,21 @@ class ViolationChecker:
     - 當違規成立時，依序執行註冊的懲罰回呼函式
 
     屬性：
-    - last_penalty_time: 上一次觸發懲罰的時間戳記
+    - last_penalty_time: 上一次觸發懲罰的時間（time.monotonic() 秒數）
     - penalty_cooldown_seconds: 兩次懲罰間的最短間隔秒數
     - penalty_callbacks: 觸發懲罰時需執行的異步函式列表
     """
 
     def __init__(
         self,
-        log_callback: Callable[[str, str, bool], None],
+        log_callback: Callable[..., None],
         broadcast_event_callback: Callable,
         penalty_cooldown_seconds: int = 30
     ) -> None:
         """初始化違規檢查器。
 
         Args:
-            log_callback: 紀錄日誌的函式 (key, message, force)
+            log_callback: 紀錄日誌的函式 (key, message, force[, args])
             broadcast_event_callback: 發送 Socket 事件的異步函式
             penalty_cooldown_seconds: 懲罰觸發冷卻時間（秒）
         """
@@ -47,7 +49,7 @@ class ViolationChecker:
         self._broadcast_event = broadcast_event_callback
         self.penalty_cooldown_seconds = penalty_cooldown_seconds
 
-        self.last_penalty_time: Optional[datetime] = None
+        self.last_penalty_time: Optional[float] = None
         self.penalty_callbacks: List[Callable] = []
         self.current_hostage_path: Optional[str] = None
 
@@ -78,11 +80,10 @@ class ViolationChecker:
         Returns:
             Tuple: (是否可觸發, 剩餘冷卻秒數)
         """
-        now = datetime.now()
         if self.last_penalty_time is None:
             return True, 0.0
 
-        elapsed = (now - self.last_penalty_time).total_seconds()
+        elapsed = time.monotonic() - self.last_penalty_time
         if elapsed >= self.penalty_cooldown_seconds:
             return True, 0.0
 
@@ -98,35 +99,54 @@ class ViolationChecker:
         Returns:
             Tuple: (是否偵測到違規, 違規原因說明)
         """
-        # 1. 檢查手機是否被移除
-        if config.enable_phone_penalty and state.phone_status == PhoneStatus.REMOVED:
+        # 各項開關先讀入區域變數，後續判斷不再重複存取屬性
+        enable_phone = config.enable_phone_penalty
+        enable_presence = config.enable_presence_penalty
+        enable_box = config.enable_box_open_penalty
+        enable_noise = config.enable_noise_penalty
+
+        # 所有懲罰項目皆停用時不需逐項檢查，僅重置噪音計時器
+        if not (enable_phone or enable_presence or enable_box or enable_noise):
+            state.noise_start_time = None
+            return False, ""
+
+        # 各項時間長度皆以同一個時間點計算，每次檢查只取得一次目前時間
+        now = datetime.now()
+
+        # 1. 檢查手機是否被移除（列舉成員為單例，以 is 比較）
+        if enable_phone and state.phone_status is PhoneStatus.REMOVED:
             self._log('violation_phone', "[違規] 專注期間手機已被移出盒子！", False)
             return True, "手機被移出"
 
         # 2. 檢查人員是否離開位置
-        if config.enable_presence_penalty and state.person_away_since:
-            away_duration = (datetime.now() - state.person_away_since).total_seconds()
-            if away_duration > config.presence_duration_sec:
-                self._log('violation_away', f"[違規] 人員離開位置超過 {away_duration:.1f} 秒！", False)
-                return True, f"人員離位 {away_duration:.1f} 秒"
+        if enable_presence:
+            away_since = state.person_away_since
+            if away_since:
+                away_duration = (now - away_since).total_seconds()
+                if away_duration > config.presence_duration_sec:
+                    self._log('violation_away', "[違規] 人員離開位置超過 %.1f 秒！", False, (away_duration,))
+                    return True, f"人員離位 {away_duration:.1f} 秒"
 
         # 3. 檢查盒子是否被打開
-        if config.enable_box_open_penalty and state.box_status == BoxStatus.OPEN:
+        if enable_box and state.box_status is BoxStatus.OPEN:
             self._log('violation_box_open', "[違規] 專注期間盒子已被打開！", False)
             return True, "盒子被打開"
 
         # 4. 檢查環境噪音水平
-        if config.enable_noise_penalty and state.noise_status == NoiseStatus.NOISY:
+        if enable_noise and state.noise_status is NoiseStatus.NOISY:
             # 如果是剛開始偵測到噪音，記錄起始時間
-            if not state.noise_start_time:
-                state.noise_start_time = datetime.now()
-            
-            noise_duration = (datetime.now() - state.noise_start_time).total_seconds()
+            noise_start = state.noise_start_time
+            if not noise_start:
+                noise_start = state.noise_start_time = now
+
+            noise_duration = (now - noise_start).total_seconds()
             # 噪音持續時間超過設定閾值才算違規
             if noise_duration > config.noise_duration_sec:
-                self._log('violation_noise', f"[違規] 噪音違規 ({state.current_db} dB 持續 {noise_duration:.1f} 秒)！", False)
+                current_db = state.current_db
+                self._log('violation_noise', "[違規] 噪音違規 (%s dB 持續 %.1f 秒)！", False,
+                          (current_db, noise_duration))
                 state.noise_start_time = None
-                return True, f"偵測到噪音 ({state.current_db} dB)"
+                return True, f"偵測到噪音 ({current_db} dB)"
         else:
             # 恢復安靜時重置計時器
             state.noise_start_time = None
@@ -161,7 +181,7 @@ class ViolationChecker:
         # 正式標記違規並更新 session 狀態
         state.session.violations += 1
         state.session.status = SessionStatus.VIOLATED
-        self.last_penalty_time = datetime.now()
+        self.last_penalty_time = time.monotonic()
 
         safe_print(f"[違規] 啟動懲罰流程，原因：{violation_reason}")
         await self._trigger_penalty(state)
@@ -177,7 +197,6 @@ class ViolationChecker:
         safe_print("[懲罰協定] 偵測到違規，通知前端開始懲罰動畫...")
 
         # 通知所有前端目前的懲罰狀態
-        from .daily_violation_store import daily_violation_store
         today_count = daily_violation_store.get_count()
         await self._broadcast_event('penalty_triggered', {
             'timestamp': datetime.now().isoformat(),
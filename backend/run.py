@@ -20,6 +20,22 @@ if sys.platform == 'win32':
     # 關閉偵錯模式以提升效能
     os.environ['PYTHONASYNCIODEBUG'] = '0'
 
+
+def select_event_loop() -> str:
+    """選擇 Uvicorn 使用的事件迴圈實作。
+
+    非 Windows 平台且已安裝 uvloop（uvicorn[standard] 於非 Windows 平台會一併安裝）時使用 uvloop；
+    Windows 必須維持 ProactorEventLoop 以支援 Playwright，因此一律使用標準 asyncio。
+    """
+    if sys.platform == 'win32':
+        return "asyncio"
+    try:
+        import uvloop  # noqa: F401
+    except ImportError:
+        return "asyncio"
+    return "uvloop"
+
+
 if __name__ == "__main__":
     import uvicorn
     from app.config import settings
@@ -29,6 +45,8 @@ if __name__ == "__main__":
     safe_print(f"位址: {settings.HOST}:{settings.PORT}")
     safe_print(f"偵錯模式: {settings.DEBUG}")
     safe_print(f"硬體模擬: {settings.MOCK_HARDWARE}")
+    loop_impl = select_event_loop()
+    safe_print(f"事件迴圈: {loop_impl}")
     safe_print("=" * 65)
     
     # 執行伺服器作業
@@ -39,7 +57,7 @@ if __name__ == "__main__":
         reload=settings.DEBUG,
         # 僅監視 app 目錄以減少無效載入
         reload_dirs=["./app"] if settings.DEBUG else None,
-        loop="asyncio",
+        loop=loop_impl,
         # 使用單一進程模式以避免 Windows 子進程開銷與報錯
         workers=1,
         # 根據偵錯模式調整日誌層級
@@ -4,18 +4,11 @@ Pytest Configuration and Fixtures
 Provides shared fixtures for testing Focus Enforcer backend.
 """
 
-import asyncio
 import pytest
-from typing import Generator, AsyncGenerator
+from typing import AsyncGenerator
 from fastapi.testclient import TestClient
 
-
-@pytest.fixture(scope="session")
-def event_loop() -> Generator:
-    """Create an event loop for async tests."""
-    loop = asyncio.get_event_loop_policy().new_event_loop()
-    yield loop
-    loop.close()
+# Async tests share a single session-scoped event loop configured in pytest.ini
 
 
 @pytest.fixture
@@ -4,7 +4,6 @@ Tests for Progressive Penalty Module
 Tests for the graduated penalty system.
 """
 
-import pytest
 import asyncio
 from datetime import datetime
 from unittest.mock import AsyncMock, MagicMock
@@ -71,16 +70,18 @@ class TestProgressivePenaltyManager:
     def test_determine_level(self):
         """Test penalty level determination based on violation count."""
         manager = ProgressivePenaltyManager()
-        
-        assert manager._determine_level(0) == PenaltyLevel.NONE
-        assert manager._determine_level(1) == PenaltyLevel.BLUE
-        assert manager._determine_level(2) == PenaltyLevel.YELLOW
-        assert manager._determine_level(3) == PenaltyLevel.RED
-        assert manager._determine_level(4) == PenaltyLevel.RED
-        assert manager._determine_level(5) == PenaltyLevel.CRITICAL
-        assert manager._determine_level(10) == PenaltyLevel.CRITICAL
+        # Every level exists and its value matches its name
+        names = ("NONE", "BLUE", "YELLOW", "RED", "CRITICAL")
+        assert {level.name: level.value for level in PenaltyLevel} == {name: name for name in names}
+        
+        counts = (0, 1, 2, 3, 4, 5, 10)
+        expected = [
+            PenaltyLevel.NONE, PenaltyLevel.BLUE, PenaltyLevel.YELLOW,
+            PenaltyLevel.RED, PenaltyLevel.RED,
+            PenaltyLevel.CRITICAL, PenaltyLevel.CRITICAL,
+        ]
+        assert [manager._determine_level(count) for count in counts] == expected
     
-    @pytest.mark.asyncio
     async def test_record_violation_when_inactive(self):
         """Test violation recording when manager is inactive."""
         manager = ProgressivePenaltyManager()
@@ -90,7 +91,6 @@ class TestProgressivePenaltyManager:
         assert result == PenaltyLevel.NONE
         assert manager.state.count == 0
     
-    @pytest.mark.asyncio
     async def test_first_violation_starts_grace_period(self):
         """Test that first violation starts grace period."""
         manager = ProgressivePenaltyManager()
@@ -107,7 +107,6 @@ class TestProgressivePenaltyManager:
         # Clean up
         manager.stop_session()
     
-    @pytest.mark.asyncio
     async def test_violation_resolved_during_grace_period(self):
         """Test violation resolution during grace period."""
         manager = ProgressivePenaltyManager()
@@ -125,7 +124,6 @@ class TestProgressivePenaltyManager:
         
         manager.stop_session()
     
-    @pytest.mark.asyncio
     async def test_second_violation_escalates(self):
         """Test that second violation escalates to yellow level."""
         manager = ProgressivePenaltyManager()
@@ -142,7 +140,6 @@ class TestProgressivePenaltyManager:
         
         manager.stop_session()
     
-    @pytest.mark.asyncio
     async def test_callback_registration(self):
         """Test callback registration and execution."""
         manager = ProgressivePenaltyManager()
@@ -165,7 +162,6 @@ class TestProgressivePenaltyManager:
         
         manager.stop_session()
     
-    @pytest.mark.asyncio
     async def test_broadcast_callback(self):
         """Test broadcast callback for frontend updates."""
         manager = ProgressivePenaltyManager()
@@ -201,15 +197,3 @@ class TestProgressivePenaltyManager:
         assert state['levels_executed'] == []
         
         manager.stop_session()
-
-
-class TestPenaltyLevel:
-    """Tests for PenaltyLevel enum."""
-    
-    def test_levels_exist(self):
-        """Test all expected levels exist."""
-        assert PenaltyLevel.NONE.value == "NONE"
-        assert PenaltyLevel.BLUE.value == "BLUE"
-        assert PenaltyLevel.YELLOW.value == "YELLOW"
-        assert PenaltyLevel.RED.value == "RED"
-        assert PenaltyLevel.CRITICAL.value == "CRITICAL"
@@ -0,0 +1,147 @@
+"""
+Tests for Session Store Module
+===============================
+Tests for session history persistence and statistics.
+"""
+
+import json
+
+from app.session_store import SessionStore, SessionRecord
+
+
+def make_record(record_id: str, start_time: str, status: str = "COMPLETED") -> SessionRecord:
+    """Build a session record with fixed durations."""
+    return SessionRecord(
+        id=record_id,
+        start_time=start_time,
+        end_time=start_time,
+        duration_minutes=25,
+        status=status,
+        total_focus_time_seconds=1500
+    )
+
+
+class TestSessionStorePersistence:
+    """Tests for the JSON Lines history file."""
+
+    def test_add_session_appends_one_line(self, tmp_path):
+        """Test that each added session is appended as a single line."""
+        store = SessionStore(data_dir=tmp_path)
+        store.add_session(make_record("a", "2025-01-01T10:00:00"))
+        store.add_session(make_record("b", "2025-01-01T11:00:00"))
+
+        lines = store.history_file.read_text(encoding='utf-8').splitlines()
+        assert len(lines) == 2
+        assert json.loads(lines[1])["id"] == "b"
+
+    def test_history_survives_reload(self, tmp_path):
+        """Test that a new store instance reads back appended sessions."""
+        store = SessionStore(data_dir=tmp_path)
+        store.add_session(make_record("a", "2025-01-01T10:00:00"))
+
+        reloaded = SessionStore(data_dir=tmp_path)
+        assert [r.id for r in reloaded.get_history()] == ["a"]
+
+    def test_add_session_accepts_dict(self, tmp_path):
+        """Test that a plain dict is stored and read back as a record."""
+        store = SessionStore(data_dir=tmp_path)
+        store.add_session(make_record("a", "2025-01-01T10:00:00").model_dump())
+
+        assert isinstance(store.get_history()[0], SessionRecord)
+        assert store.get_statistics()["total_focus_time_hours"] == round(1500 / 3600, 2)
+
+        reloaded = SessionStore(data_dir=tmp_path)
+        assert reloaded.get_history()[0] == make_record("a", "2025-01-01T10:00:00")
+
+    def test_corrupt_line_is_skipped(self, tmp_path):
+        """Test that a truncated trailing line does not discard other records."""
+        store = SessionStore(data_dir=tmp_path)
+        store.add_session(make_record("a", "2025-01-01T10:00:00"))
+        with open(store.history_file, 'a', encoding='utf-8') as f:
+            f.write('{"id": "broken"')
+
+        reloaded = SessionStore(data_dir=tmp_path)
+        assert [r.id for r in reloaded.get_history()] == ["a"]
+
+        # The broken line is dropped, so later appends start on a fresh line
+        reloaded.add_session(make_record("b", "2025-01-01T11:00:00"))
+        assert len(SessionStore(data_dir=tmp_path).get_history()) == 2
+
+    def test_legacy_json_is_migrated(self, tmp_path):
+        """Test that a legacy JSON array history is converted to JSON Lines."""
+        legacy = [make_record("old", "2024-12-31T09:00:00").model_dump()]
+        (tmp_path / "session_history.json").write_text(json.dumps(legacy), encoding='utf-8')
+
+        store = SessionStore(data_dir=tmp_path)
+        assert [r.id for r in store.get_history()] == ["old"]
+        assert store.history_file.exists()
+
+
+class TestSessionStoreStatistics:
+    """Tests for the aggregated session statistics."""
+
+    def test_empty_statistics(self, tmp_path):
+        """Test statistics for a store without history."""
+        stats = SessionStore(data_dir=tmp_path).get_statistics()
+        assert stats["total_sessions"] == 0
+        assert stats["completion_rate"] == 0.0
+
+    def test_statistics_match_after_add_and_reload(self, tmp_path):
+        """Test that incremental statistics equal those computed on load."""
+        store = SessionStore(data_dir=tmp_path)
+        store.add_session(make_record("a", "2025-01-01T10:00:00", "COMPLETED"))
+        store.add_session(make_record("b", "2025-01-01T11:00:00", "VIOLATED"))
+        store.add_session(make_record("c", "2025-01-01T12:00:00", "CANCELLED"))
+
+        stats = store.get_statistics()
+        assert stats["total_sessions"] == 3
+        assert stats["completed_sessions"] == 1
+        assert stats["violated_sessions"] == 1
+        assert stats["completion_rate"] == 33.3
+        assert stats["total_focus_time_hours"] == 1.25
+        assert stats["average_session_minutes"] == 25.0
+        assert SessionStore(data_dir=tmp_path).get_statistics() == stats
+
+
+class TestSessionStoreHistory:
+    """Tests for history pagination and filtering."""
+
+    def test_newest_first_pagination(self, tmp_path):
+        """Test that pages are returned newest first."""
+        store = SessionStore(data_dir=tmp_path)
+        for hour in range(10, 15):
+            store.add_session(make_record(str(hour), f"2025-01-01T{hour}:00:00"))
+
+        assert [r.id for r in store.get_history(limit=2)] == ["14", "13"]
+        assert [r.id for r in store.get_history(limit=2, offset=2)] == ["12", "11"]
+        assert [r.id for r in store.get_history(limit=2, offset=4)] == ["10"]
+        assert store.get_history(limit=2, offset=5) == []
+
+    def test_out_of_order_insert(self, tmp_path):
+        """Test that a session starting earlier than existing ones is placed correctly."""
+        store = SessionStore(data_dir=tmp_path)
+        store.add_session(make_record("late", "2025-01-02T10:00:00"))
+        store.add_session(make_record("early", "2025-01-01T10:00:00"))
+
+        assert [r.id for r in store.get_history()] == ["late", "early"]
+
+    def test_status_filter(self, tmp_path):
+        """Test filtering history by session status."""
+        store = SessionStore(data_dir=tmp_path)
+        store.add_session(make_record("a", "2025-01-01T10:00:00", "COMPLETED"))
+        store.add_session(make_record("b", "2025-01-01T11:00:00", "VIOLATED"))
+        store.add_session(make_record("c", "2025-01-01T12:00:00", "COMPLETED"))
+
+        assert [r.id for r in store.get_history(status_filter="COMPLETED")] == ["c", "a"]
+        assert store.get_history(status_filter="CANCELLED") == []
+        assert store.count() == 3
+        assert store.count("COMPLETED") == 2
+        assert store.count("CANCELLED") == 0
+
+    def test_trusted_load_matches_validated_load(self, tmp_path):
+        """Test that skipping validation on load yields the same records."""
+        store = SessionStore(data_dir=tmp_path)
+        store.add_session(make_record("a", "2025-01-01T10:00:00"))
+
+        trusted = SessionStore(data_dir=tmp_path, trust_disk=True)
+        assert trusted.get_history() == store.get_history()
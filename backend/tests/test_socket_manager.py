@@ -0,0 +1,120 @@
+"""
+Tests for SocketManager Module
+==============================
+Tests for the Socket.IO packet codec and sensor event handling.
+"""
+
+import asyncio
+from datetime import datetime, timedelta
+
+import orjson
+
+from app.models import FocusSession, PenaltyConfig, SessionStatus, SystemState
+from app.socket_manager import _OrjsonCodec, socket_manager
+
+
+class TestOrjsonCodec:
+    """Tests for _OrjsonCodec.dumps."""
+
+    def test_list_with_unhashable_first_item(self):
+        """Two-item lists whose first item is a dict or list still encode."""
+        assert orjson.loads(_OrjsonCodec.dumps([{'a': 1}, 2])) == [{'a': 1}, 2]
+        assert orjson.loads(_OrjsonCodec.dumps([[1], 2])) == [[1], 2]
+
+    def test_state_event_encoding_is_reused(self):
+        """The same state payload object is encoded only once."""
+        payload = {'current_db': 40}
+        first = _OrjsonCodec.dumps(['system_state', payload])
+
+        assert _OrjsonCodec.dumps(['system_state', payload]) is first
+        assert orjson.loads(first) == ['system_state', payload]
+
+
+class TestSensorDataHandler:
+    """Tests for the sensor_data Socket.IO handler."""
+
+    async def test_hardware_frames_are_validated(self, monkeypatch):
+        """Externally received frames are never processed as trusted."""
+        calls = []
+
+        async def record(data, trusted=False):
+            calls.append(trusted)
+
+        monkeypatch.setattr(socket_manager, 'process_sensor_data', record)
+
+        await socket_manager._on_sensor_data('hw-sid', {'mic_db': 55.5})
+
+        assert calls == [False]
+
+
+class TestBroadcastCaching:
+    """Tests for serialization reuse across broadcasts."""
+
+    async def test_event_keeps_serialized_state(self):
+        """Broadcasting an event should not invalidate the state cache."""
+        first = socket_manager._serialize_state()
+
+        await socket_manager.broadcast_event('test_event', {'value': 1})
+
+        assert socket_manager._serialize_state() is first
+
+    async def test_full_event_batch_task_is_tracked(self, monkeypatch):
+        """An immediate flush task should be referenced until it finishes."""
+        flushed = asyncio.Event()
+
+        async def record():
+            flushed.set()
+
+        monkeypatch.setattr(socket_manager, 'EVENT_COALESCE_MAX', 1)
+        monkeypatch.setattr(socket_manager, 'connected_clients', {'client-sid'})
+        monkeypatch.setattr(socket_manager, '_pending_events', [])
+        monkeypatch.setattr(socket_manager, '_flush_events', record)
+
+        await socket_manager.broadcast_event('test_event', {'value': 2})
+
+        assert len(socket_manager._background_tasks) == 1
+        await flushed.wait()
+        await asyncio.sleep(0)
+        assert not socket_manager._background_tasks
+
+
+class TestPenaltyChecks:
+    """Tests for violation checks driven by sensor data."""
+
+    async def test_sustained_noise_records_violation(self, monkeypatch, mock_sensor_data):
+        """Noise lasting past noise_duration_sec should record a violation."""
+        config = PenaltyConfig(
+            enable_phone_penalty=False,
+            enable_presence_penalty=False,
+            enable_box_open_penalty=False,
+            enable_noise_penalty=True,
+            noise_duration_sec=3,
+        )
+        state = SystemState(
+            session=FocusSession(
+                id="noise-test",
+                duration_minutes=25,
+                status=SessionStatus.ACTIVE,
+                penalty_config=config,
+            ),
+            noise_start_time=datetime.now() - timedelta(seconds=10),
+        )
+        reasons = []
+
+        async def record_violation(reason=""):
+            reasons.append(reason)
+
+        async def broadcast_state(force=False):
+            pass
+
+        monkeypatch.setattr(socket_manager._state_manager, 'state', state)
+        monkeypatch.setattr(socket_manager, '_current_violation_recorded', False)
+        monkeypatch.setattr(socket_manager._progressive_penalty, 'record_violation', record_violation)
+        monkeypatch.setattr(socket_manager, 'broadcast_state', broadcast_state)
+        version = socket_manager._state_manager.state_version
+
+        await socket_manager.process_sensor_data({**mock_sensor_data, 'mic_db': 85})
+
+        assert len(reasons) == 1
+        assert state.noise_start_time is None
+        assert socket_manager._state_manager.state_version > version
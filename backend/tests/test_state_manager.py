@@ -4,8 +4,10 @@ Tests for StateManager Module
 Tests for system state management and sensor data processing.
 """
 
+import asyncio
 import pytest
-from datetime import datetime
+from datetime import datetime, timedelta
+from types import SimpleNamespace
 from unittest.mock import MagicMock
 
 from app.state_manager import StateManager
@@ -14,13 +16,20 @@ from app.models import (
     PhoneStatus, PresenceStatus, BoxStatus, NoiseStatus, HardwareState
 )
 
+# Fixed timestamp so session times do not depend on the wall clock
+NOW = datetime(2024, 1, 1, 12, 0, 0)
+
+
+def _noop_log(*args, **kwargs):
+    """Log callback for tests that never inspect log calls."""
+
 
 class TestStateManagerInitialization:
     """Tests for StateManager initialization."""
     
     def test_default_initialization(self):
         """Verify default state manager initialization."""
-        manager = StateManager(log_callback=MagicMock())
+        manager = StateManager(log_callback=_noop_log)
         
         assert manager.state is not None
         assert manager.hardware_connected is False
@@ -33,7 +42,7 @@ class TestStateManagerInitialization:
         custom_state.current_db = 60
         
         manager = StateManager(
-            log_callback=MagicMock(),
+            log_callback=_noop_log,
             initial_state=custom_state
         )
         
@@ -46,7 +55,7 @@ class TestStateSerialization:
     @pytest.fixture
     def manager(self):
         """Create a StateManager instance."""
-        return StateManager(log_callback=MagicMock())
+        return StateManager(log_callback=_noop_log)
     
     def test_serialize_basic_state(self, manager):
         """Test basic state serialization."""
@@ -61,7 +70,7 @@ class TestStateSerialization:
         manager.state.session = FocusSession(
             id="test-123",
             duration_minutes=25,
-            start_time=datetime.now(),
+            start_time=NOW,
             status=SessionStatus.ACTIVE
         )
         
@@ -72,24 +81,107 @@ class TestStateSerialization:
         # Datetime should be ISO formatted string
         assert isinstance(state_dict['session']['start_time'], str)
 
+    def test_serialize_reuses_cached_result(self, manager):
+        """Unchanged state should return the cached dict."""
+        first = manager.serialize_state()
+
+        assert manager.serialize_state() is first
+
+    def test_bump_version_invalidates_cache(self, manager):
+        """A version bump should force a fresh serialization."""
+        first = manager.serialize_state()
+        manager.state.current_db = 70
+        manager.bump_version()
+
+        second = manager.serialize_state()
+        assert second is not first
+        assert second['current_db'] == 70
+
+    def test_daily_count_change_invalidates_cache(self, manager, monkeypatch):
+        """A new daily violation count should refresh the cached dict."""
+        counter = SimpleNamespace(get_count=lambda: 1)
+        monkeypatch.setattr("app.state_manager.daily_violation_store", counter)
+        first = manager.serialize_state()
+        counter.get_count = lambda: 2
+
+        second = manager.serialize_state()
+        assert second is not first
+        assert second['today_violation_count'] == 2
+
 
 class TestBroadcastThrottling:
     """Tests for broadcast throttling."""
     
     def test_first_broadcast_allowed(self):
         """First broadcast should always be allowed."""
-        manager = StateManager(log_callback=MagicMock())
+        manager = StateManager(log_callback=_noop_log)
         assert manager.should_broadcast() is True
     
-    def test_throttle_rapid_broadcasts(self):
-        """Rapid broadcasts should be throttled."""
-        manager = StateManager(log_callback=MagicMock())
+    def test_throttle_rapid_broadcasts(self, monkeypatch):
+        """Rapid broadcasts should be throttled until the window passes."""
+        # Fake clock so the test never waits out the window in real time
+        clock = SimpleNamespace(now=100.0)
+        monkeypatch.setattr("app.state_manager.time", SimpleNamespace(monotonic=lambda: clock.now))
+        manager = StateManager(log_callback=_noop_log)
         manager.broadcast_throttle_ms = 200
         
         manager.mark_broadcast()
         
         # Immediately after, should be throttled
         assert manager.should_broadcast() is False
+        
+        clock.now += 0.05
+        assert manager.should_broadcast() is False
+        
+        clock.now += 0.2
+        assert manager.should_broadcast() is True
+
+    def test_seconds_until_broadcast(self):
+        """Remaining wait should cover the rest of the throttle window."""
+        manager = StateManager(log_callback=_noop_log)
+        manager.broadcast_throttle_ms = 200
+        assert manager.seconds_until_broadcast() == 0.0
+
+        manager.mark_broadcast()
+        assert 0.0 < manager.seconds_until_broadcast() <= 0.2
+
+
+class TestSettingsPersistence:
+    """Tests for deferred settings writes."""
+
+    @pytest.fixture
+    def manager(self, tmp_path, monkeypatch):
+        """Create a StateManager writing settings to a temp file."""
+        monkeypatch.setattr(StateManager, "CONFIG_FILE", tmp_path / "settings.json")
+        monkeypatch.setattr(StateManager, "SETTINGS_FLUSH_DELAY_SEC", 0.01)
+        manager = StateManager(log_callback=_noop_log)
+        manager.save_settings = MagicMock(wraps=manager.save_settings)
+        return manager
+
+    def test_schedule_without_loop_writes_immediately(self, manager):
+        """Outside an event loop the settings should be written at once."""
+        manager.schedule_save_settings()
+
+        manager.save_settings.assert_called_once()
+        assert StateManager.CONFIG_FILE.exists()
+
+    def test_rapid_saves_are_coalesced(self, manager):
+        """Several saves within the delay window should produce one write."""
+        async def burst():
+            for _ in range(5):
+                manager.schedule_save_settings()
+            await asyncio.sleep(0.05)
+
+        asyncio.run(burst())
+
+        manager.save_settings.assert_called_once()
+        assert StateManager.CONFIG_FILE.exists()
+
+    def test_flush_skips_when_clean(self, manager):
+        """Flushing without pending changes should not write."""
+        manager.flush_settings()
+
+        manager.save_settings.assert_not_called()
 
 
 class TestSensorDataProcessing:
@@ -149,6 +241,58 @@ class TestSensorDataProcessing:
         manager.process_sensor_data(data2, mock_mode_active=False)
         assert manager.state.person_away_since is not None
     
+    def test_transition_logging(self, manager):
+        """Removal is only logged when leaving LOCKED, and repeats are silent."""
+        removed = {'nfc_id': None, 'radar_presence': True, 'mic_db': 40, 'box_open': False}
+        locked = {'nfc_id': 'PHONE', 'radar_presence': True, 'mic_db': 40, 'box_open': False}
+
+        manager.process_sensor_data(dict(removed), mock_mode_active=False)
+        keys = [c.args[0] for c in manager._log.call_args_list]
+        assert 'phone_removed' not in keys
+
+        manager._log.reset_mock()
+        manager.process_sensor_data(dict(locked), mock_mode_active=False)
+        manager.process_sensor_data(dict(locked), mock_mode_active=False)
+        keys = [c.args[0] for c in manager._log.call_args_list]
+        assert keys == ['phone_locked']
+
+        manager._log.reset_mock()
+        manager.process_sensor_data(dict(removed), mock_mode_active=False)
+        keys = [c.args[0] for c in manager._log.call_args_list]
+        assert keys == ['phone_removed']
+
+    def test_invalid_sensor_data_logged_by_error_type(self, manager):
+        """Parse failures go through the throttled log keyed by exception type."""
+        result = manager.process_sensor_data({'mic_db': 'loud'}, mock_mode_active=False)
+
+        assert result is None
+        key, _, force, args = manager._log.call_args.args
+        assert key == 'sensor_error_ValidationError'
+        assert force is False
+        assert len(args) == 1
+
+    def test_trusted_sensor_data_matches_validated(self, manager):
+        """Trusted frames should yield the same state as validated ones."""
+        data = {'nfc_id': '', 'radar_presence': 1, 'mic_db': 55.0, 'box_locked': True,
+                'state': 'FOCUSING', 'ldr_detected': True}
+
+        validated = manager.process_sensor_data(dict(data), mock_mode_active=False)
+        trusted = manager.process_sensor_data(dict(data), mock_mode_active=False, trusted=True)
+
+        assert trusted.model_dump() == validated.model_dump()
+        assert manager.state.current_db == 55
+        assert manager.state.phone_status == PhoneStatus.REMOVED
+
+    def test_non_integral_mic_db_rejected(self, manager):
+        """Untrusted frames with a fractional mic_db are rejected, not truncated."""
+        manager.process_sensor_data({'nfc_id': 'PHONE', 'mic_db': 50}, mock_mode_active=False)
+
+        result = manager.process_sensor_data({'nfc_id': 'PHONE', 'mic_db': 55.5}, mock_mode_active=False)
+
+        assert result is None
+        assert manager.state.current_db == 50
+        assert manager.state.last_sensor_data.mic_db == 50
+
     def test_mock_mode_phone_logic(self, manager):
         """Test mock mode doesn't tie phone status to box_open."""
         data = {
@@ -166,7 +310,9 @@ class TestSensorDataProcessing:
     
     def test_noise_detection(self, manager):
         """Test noise detection based on threshold."""
-        manager.state.penalty_config.noise_threshold_db = 70
+        manager.state.penalty_config = manager.state.penalty_config.model_copy(
+            update={'noise_threshold_db': 70}
+        )
         
         # Below threshold
         data1 = {'nfc_id': 'PHONE', 'radar_presence': True, 'mic_db': 60, 'box_open': False}
@@ -185,7 +331,7 @@ class TestSessionManagement:
     @pytest.fixture
     def manager(self):
         """Create a StateManager instance."""
-        return StateManager(log_callback=MagicMock())
+        return StateManager(log_callback=_noop_log)
     
     def test_start_session(self, manager):
         """Test starting a focus session."""
@@ -233,12 +379,12 @@ class TestSessionManagement:
         manager.start_session(25)
         manager.pause_session()
         
-        # Simulate some time passing (modify paused_at directly for test)
-        manager.state.session.total_paused_seconds = 0
+        # Simulate five seconds passing by backdating paused_at
+        manager.state.session.paused_at -= timedelta(seconds=5)
         manager.resume_session()
         
-        # After resume, total_paused_seconds should be updated
-        assert manager.state.session.total_paused_seconds >= 0
+        assert manager.state.session.total_paused_seconds == 5
+        assert manager.state.session.paused_at is None
 
 
 class TestHardwareInfo:
@@ -246,7 +392,7 @@ class TestHardwareInfo:
     
     def test_update_hardware_info(self):
         """Test updating hardware connection info."""
-        manager = StateManager(log_callback=MagicMock())
+        manager = StateManager(log_callback=_noop_log)
         
         manager.update_hardware_info(
             hardware_id="FOCUS-001",
@@ -269,7 +415,7 @@ class TestStateReset:
     
     def test_reset_state(self):
         """Test state reset clears sensor statuses."""
-        manager = StateManager(log_callback=MagicMock())
+        manager = StateManager(log_callback=_noop_log)
         
         # Set some state
         manager.state.phone_status = PhoneStatus.LOCKED
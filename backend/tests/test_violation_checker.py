@@ -5,8 +5,9 @@ Tests for violation detection and penalty triggering logic.
 """
 
 import pytest
+import time
 from datetime import datetime, timedelta
-from unittest.mock import AsyncMock, MagicMock
+from unittest.mock import AsyncMock
 
 from app.violation_checker import ViolationChecker
 from app.models import (
@@ -14,27 +15,43 @@ from app.models import (
     PhoneStatus, PresenceStatus, BoxStatus, NoiseStatus
 )
 
+# Fixed timestamp so session times do not depend on the wall clock
+NOW = datetime(2024, 1, 1, 12, 0, 0)
+
+
+def _noop_log(*args, **kwargs):
+    """Log callback for tests that never inspect log calls."""
+
+
+async def _noop_broadcast(*args, **kwargs):
+    """Broadcast callback for tests that never inspect broadcasts."""
+
+
+@pytest.fixture(scope="class")
+def mock_broadcast():
+    """Create a mock broadcast callback shared by a test class."""
+    return AsyncMock()
+
+
+@pytest.fixture(scope="class")
+def checker(mock_broadcast):
+    """Create a ViolationChecker instance shared by a test class."""
+    return ViolationChecker(
+        log_callback=_noop_log,
+        broadcast_event_callback=mock_broadcast
+    )
+
 
 class TestViolationDetection:
     """Tests for violation detection logic."""
     
-    @pytest.fixture
-    def mock_log(self):
-        """Create a mock log callback."""
-        return MagicMock()
-    
-    @pytest.fixture
-    def mock_broadcast(self):
-        """Create a mock broadcast callback."""
-        return AsyncMock()
-    
-    @pytest.fixture
-    def checker(self, mock_log, mock_broadcast):
-        """Create a ViolationChecker instance."""
-        return ViolationChecker(
-            log_callback=mock_log,
-            broadcast_event_callback=mock_broadcast
-        )
+    @pytest.fixture(autouse=True)
+    def reset_checker(self, checker, mock_broadcast):
+        """Clear state left on the shared checker by the previous test."""
+        checker.reset_penalty_timer()
+        checker.set_hostage_path(None)
+        checker.penalty_callbacks.clear()
+        mock_broadcast.reset_mock()
     
     @pytest.fixture
     def active_session(self):
@@ -42,11 +59,10 @@ class TestViolationDetection:
         return FocusSession(
             id="test-session",
             duration_minutes=25,
-            start_time=datetime.now(),
+            start_time=NOW,
             status=SessionStatus.ACTIVE
         )
     
-    @pytest.mark.asyncio
     async def test_no_violation_when_no_session(self, checker):
         """No violation should be detected without active session."""
         state = SystemState()
@@ -55,7 +71,6 @@ class TestViolationDetection:
         result = await checker.check_and_trigger(state)
         assert result is False
     
-    @pytest.mark.asyncio
     async def test_no_violation_when_session_paused(self, checker, active_session):
         """No violation when session is paused."""
         state = SystemState()
@@ -66,7 +81,6 @@ class TestViolationDetection:
         result = await checker.check_and_trigger(state)
         assert result is False
     
-    @pytest.mark.asyncio
     async def test_phone_removal_violation(self, checker, active_session, mock_broadcast):
         """Phone removal should trigger violation."""
         state = SystemState()
@@ -80,7 +94,6 @@ class TestViolationDetection:
         assert state.session.status == SessionStatus.VIOLATED
         mock_broadcast.assert_called()
     
-    @pytest.mark.asyncio
     async def test_box_open_violation(self, checker, active_session, mock_broadcast):
         """Box open should trigger violation if enabled."""
         state = SystemState()
@@ -92,7 +105,6 @@ class TestViolationDetection:
         assert result is True
         assert state.session.violations == 1
     
-    @pytest.mark.asyncio
     async def test_penalty_disabled_no_violation(self, checker, active_session):
         """No violation when penalty is disabled for that sensor."""
         state = SystemState()
@@ -110,7 +122,6 @@ class TestViolationDetection:
         assert result is False
         assert state.session.violations == 0
     
-    @pytest.mark.asyncio
     async def test_noise_violation_above_threshold(self, checker, active_session):
         """Noise above threshold should trigger violation if enabled."""
         state = SystemState()
@@ -134,19 +145,18 @@ class TestPenaltyCooldown:
     def checker(self):
         """Create a ViolationChecker with short cooldown."""
         return ViolationChecker(
-            log_callback=MagicMock(),
-            broadcast_event_callback=AsyncMock(),
+            log_callback=_noop_log,
+            broadcast_event_callback=_noop_broadcast,
             penalty_cooldown_seconds=5
         )
     
-    @pytest.mark.asyncio
     async def test_cooldown_prevents_spam(self, checker):
         """Penalty should not trigger during cooldown."""
         state = SystemState()
         state.session = FocusSession(
             id="test",
             duration_minutes=25,
-            start_time=datetime.now(),
+            start_time=NOW,
             status=SessionStatus.ACTIVE
         )
         state.phone_status = PhoneStatus.REMOVED
@@ -164,7 +174,7 @@ class TestPenaltyCooldown:
     
     def test_reset_penalty_timer(self, checker):
         """Reset timer should allow immediate penalty."""
-        checker.last_penalty_time = datetime.now()
+        checker.last_penalty_time = time.monotonic()
         checker.reset_penalty_timer()
         assert checker.last_penalty_time is None
 
@@ -175,8 +185,8 @@ class TestHostageManagement:
     def test_set_hostage_path(self):
         """Test setting hostage path."""
         checker = ViolationChecker(
-            log_callback=MagicMock(),
-            broadcast_event_callback=AsyncMock()
+            log_callback=_noop_log,
+            broadcast_event_callback=_noop_broadcast
         )
         
         checker.set_hostage_path("/path/to/image.jpg")
@@ -189,7 +199,6 @@ class TestHostageManagement:
 class TestPenaltyCallbacks:
     """Tests for penalty callback registration and execution."""
     
-    @pytest.mark.asyncio
     async def test_register_and_execute_callback(self):
         """Test callback is registered and executed on penalty."""
         callback_executed = False
@@ -199,8 +208,8 @@ class TestPenaltyCallbacks:
             callback_executed = True
         
         checker = ViolationChecker(
-            log_callback=MagicMock(),
-            broadcast_event_callback=AsyncMock()
+            log_callback=_noop_log,
+            broadcast_event_callback=_noop_broadcast
         )
         checker.register_callback(my_callback)
         
@@ -208,7 +217,7 @@ class TestPenaltyCallbacks:
         state.session = FocusSession(
             id="test",
             duration_minutes=25,
-            start_time=datetime.now(),
+            start_time=NOW,
             status=SessionStatus.ACTIVE
         )
         state.phone_status = PhoneStatus.REMOVED
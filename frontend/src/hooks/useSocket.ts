@@ -430,10 +430,15 @@ export function useSocket() {
 
     // --- 業務數據事件監聽 ---
 
-    // 接收來自伺服器的全局狀態更新 (廣播)
-    socketInstance.on('system_state', (state: SystemState) => {
-      setSystemState(state)
+    // 伺服器會將短時間內的多個事件合併為單一 batch 訊框，逐筆交由對應的事件監聽器處理
+    socketInstance.on('batch', (packets: [string, unknown][]) => {
+      for (const [event, data] of packets) {
+        socketInstance.listeners(event).forEach(listener => listener(data))
+      }
+    })
 
+    // 感測器歷史與今日違規次數的同步：完整狀態與差異更新共用
+    const syncDerivedState = (state: Partial<SystemState>) => {
       // 更新即時感測器圖表歷史
       if (state.last_sensor_data) {
         historyRef.current = [...historyRef.current.slice(-59), state.last_sensor_data]
@@ -444,11 +449,26 @@ export function useSocket() {
       if (state.today_violation_count !== undefined) {
         setTodayViolationCount(state.today_violation_count)
       }
+    }
+
+    // 接收來自伺服器的全局狀態更新 (連線時的完整狀態)
+    socketInstance.on('system_state', (state: SystemState) => {
+      setSystemState(state)
+      syncDerivedState(state)
+    })
+
+    // 接收狀態差異更新：僅包含自上次推送後有變動的欄位，合併至現有狀態
+    socketInstance.on('state_patch', (patch: Partial<SystemState>) => {
+      setSystemState(prev => (prev ? { ...prev, ...patch } : prev))
+      syncDerivedState(patch)
     })
 
     // 接收硬體狀態變更事件
     socketInstance.on('hardware_status', (status: HardwareStatus) => {
-      console.log('[WS] Received hardware_status:', status)
+      // 此事件隨每次模擬狀態切換推送，僅在開發模式輸出，避免正式版主控台持續保留物件
+      if (import.meta.env.DEV) {
+        console.log('[WS] Received hardware_status:', status)
+      }
 
       // 清除模擬切換的 Loading 定時器
       // eslint-disable-next-line @typescript-eslint/no-explicit-any